@@ -3,14 +3,15 @@ System monitoring and analytics endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
 from app.utils.cache_manager import cache_manager
 from app.utils.rate_limiter import rate_limiter, performance_monitor
 from app.utils.quality_validator import (
-    video_quality_validator,
-    performance_tester,
-    system_health_checker
+    get_video_quality_validator,
+    get_performance_tester,
+    get_system_health_checker
 )
 from typing import Optional, Dict, Any
 import logging
@@ -19,11 +20,11 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/health", response_model=dict)
+@router.get("/health", response_model=dict, response_class=ORJSONResponse)
 async def get_system_health():
     """Get comprehensive system health status"""
     try:
-        health_status = await system_health_checker.run_health_check()
+        health_status = await get_system_health_checker().run_health_check()
         
         return {
             "success": True,
@@ -95,7 +96,7 @@ async def cleanup_cache():
         )
 
 
-@router.post("/performance/test", response_model=dict)
+@router.post("/performance/test", response_model=dict, response_class=ORJSONResponse)
 async def run_performance_test(
     test_type: str = Query("quick_test", description="Test type: quick_test, standard_test, stress_test")
 ):
@@ -107,7 +108,7 @@ async def run_performance_test(
                 detail="Invalid test type. Must be one of: quick_test, standard_test, stress_test"
             )
         
-        test_result = await performance_tester.run_performance_test(test_type)
+        test_result = await get_performance_tester().run_performance_test(test_type)
         
         return {
             "success": True,
@@ -124,11 +125,11 @@ async def run_performance_test(
         )
 
 
-@router.get("/performance/summary", response_model=dict)
+@router.get("/performance/summary", response_model=dict, response_class=ORJSONResponse)
 async def get_performance_test_summary():
     """Get summary of all performance tests"""
     try:
-        summary = performance_tester.get_performance_summary()
+        summary = get_performance_tester().get_performance_summary()
         
         return {
             "success": True,
@@ -143,11 +144,11 @@ async def get_performance_test_summary():
         )
 
 
-@router.post("/validate/video-config", response_model=dict)
+@router.post("/validate/video-config", response_model=dict, response_class=ORJSONResponse)
 async def validate_video_configuration(config: dict):
     """Validate video configuration for quality and compliance"""
     try:
-        validation_result = await video_quality_validator.validate_video_config(config)
+        validation_result = await get_video_quality_validator().validate_video_config(config)
         
         return {
             "success": True,
@@ -167,10 +168,10 @@ async def get_analytics_overview(db: AsyncSession = Depends(get_db)):
     """Get comprehensive system analytics overview"""
     try:
         # Combine various system metrics
-        health_status = await system_health_checker.run_health_check()
+        health_status = await get_system_health_checker().run_health_check()
         performance_stats = performance_monitor.get_performance_stats()
         cache_stats = await cache_manager.get_cache_stats()
-        performance_summary = performance_tester.get_performance_summary()
+        performance_summary = get_performance_tester().get_performance_summary()
         
         analytics_overview = {
             "system_health": {
@@ -214,12 +215,12 @@ async def get_analytics_overview(db: AsyncSession = Depends(get_db)):
         )
 
 
-@router.get("/metrics/detailed", response_model=dict)
+@router.get("/metrics/detailed", response_model=dict, response_class=ORJSONResponse)
 async def get_detailed_metrics():
     """Get detailed system metrics for monitoring dashboards"""
     try:
         # Collect detailed metrics from all systems
-        health_status = await system_health_checker.run_health_check()
+        health_status = await get_system_health_checker().run_health_check()
         performance_stats = performance_monitor.get_performance_stats()
         cache_stats = await cache_manager.get_cache_stats()
         
@@ -140,8 +140,8 @@ async def handle_websocket_message(connection_id: str, user_id: int, message: Di
         }, user_id)
     
     elif message_type == "get_status":
-        # Get current connection status
-        stats = connection_manager.get_connection_stats()
+        # Get current connection status; other users' connection counts are not sent to clients
+        stats = connection_manager.get_connection_stats(include_per_user=False)
         await connection_manager.send_personal_message({
             "type": "status_response",
             "connection_stats": stats,
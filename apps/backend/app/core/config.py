@@ -62,6 +62,7 @@ class Settings(BaseSettings):
     DEFAULT_VIDEO_QUALITY: str = "medium"
     VIDEO_BITRATE: str = "2000k"
     AUDIO_BITRATE: str = "128k"
+    VIDEO_ENGINE_ENABLED: bool = False  # Render with the TypeScript engine in packages/video-engine
     
     # Celery Configuration (Background Tasks)
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
@@ -129,6 +130,7 @@ class Settings(BaseSettings):
     # Monitoring & Analytics
     SENTRY_DSN: Optional[str] = None
     ANALYTICS_ENABLED: bool = False
+    PERFORMANCE_HISTORY_SIZE: int = 1024  # Performance test results kept in memory
     
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100
@@ -2,138 +2,207 @@
 Rate limiting and API optimization middleware
 """
 
+import math
+import re
 import time
 import asyncio
-from typing import Dict, Any, Optional, Callable
-from collections import defaultdict, deque
+from array import array
+from typing import Dict, Any, Final, List, Optional, Callable, Tuple
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
+from enum import IntEnum
 from fastapi import HTTPException, status, Request, Response
 from fastapi.responses import JSONResponse
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bucket and uptime arithmetic uses the monotonic clock so wall-clock jumps (NTP)
+# cannot distort rate limits; add this offset to convert to a Unix timestamp
+_MONOTONIC_EPOCH = time.time() - time.monotonic()
+
+
+class RateLimitCategory(IntEnum):
+    """Rate limit categories; values index the limit, window and name tuples below"""
+    DEFAULT = 0
+    AUTH = 1
+    UPLOAD = 2
+    VIDEO_GENERATION = 3
+    API_HEAVY = 4
+
+
+# Rate limit configurations, indexed by RateLimitCategory
+_RATE_LIMIT_REQUESTS = (
+    100,  # default: 100 requests per hour
+    10,   # auth: 10 auth requests per 5 minutes
+    20,   # upload: 20 uploads per hour
+    5,    # video_generation: 5 video generations per hour
+    50,   # api_heavy: 50 heavy API calls per hour
+)
+_RATE_LIMIT_WINDOWS = (3600, 300, 3600, 3600, 3600)
+_RATE_LIMIT_NAMES = ("default", "auth", "upload", "video_generation", "api_heavy")
+
+# Matches "<METHOD> <path>" and names the first rate limit category that applies,
+# checked in priority order: auth, upload, video generation, heavy API calls.
+# DOTALL lets the lookaheads see past a decoded newline in the path.
+_RATE_LIMIT_KEY_PATTERN = re.compile(
+    r"(?:"
+    r"(?=.*/auth/)(?P<AUTH>)"
+    r"|(?=.*/upload|POST .*/assets/)(?P<UPLOAD>)"
+    r"|(?=.*/videos/generate)(?P<VIDEO_GENERATION>)"
+    r"|(?=.*(?:/videos/|/templates/customize|/templates/preview))(?P<API_HEAVY>)"
+    r")",
+    re.DOTALL
+)
+
+
+def _refilled_tokens(
+    bucket: Optional[Tuple[float, float]],
+    capacity: int,
+    refill_rate: float,
+    current_time: float
+) -> float:
+    """Tokens available in a bucket at ``current_time``; a missing bucket is full"""
+    if bucket is None:
+        return float(capacity)
+    return min(capacity, bucket[0] + (current_time - bucket[1]) * refill_rate)
+
 
 class RateLimiter:
-    """Rate limiting implementation with sliding window"""
+    """Rate limiting implementation with per-client token buckets"""
     
-    def __init__(self):
-        # Store request timestamps for each client
-        self._requests: Dict[str, deque] = defaultdict(lambda: deque())
-        
-        # Rate limit configurations
-        self.rate_limits = {
-            "default": {"requests": 100, "window": 3600},  # 100 requests per hour
-            "auth": {"requests": 10, "window": 300},       # 10 auth requests per 5 minutes
-            "upload": {"requests": 20, "window": 3600},    # 20 uploads per hour
-            "video_generation": {"requests": 5, "window": 3600},  # 5 video generations per hour
-            "api_heavy": {"requests": 50, "window": 3600}, # 50 heavy API calls per hour
-        }
+    __slots__ = ("_buckets", "_clock")
+    
+    # Upper bound on tracked (client, category) buckets; least recently used are evicted
+    MAX_BUCKETS = 100_000
+    # Background reaper: seconds between passes and max idle buckets dropped per pass
+    REAP_INTERVAL = 1.0
+    REAP_BATCH_SIZE = 1024
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        # Monotonic time source in seconds; replaceable in tests
+        self._clock = clock
+        # (client_id, category) -> (tokens, last_refill), kept in LRU order
+        self._buckets: "OrderedDict[Tuple[str, int], Tuple[float, float]]" = OrderedDict()
+    
+    def reap_idle_buckets(self, batch_size: int) -> int:
+        """Drop up to ``batch_size`` least recently used buckets that have been idle for a full window
         
-        # Cleanup interval (seconds)
-        self.cleanup_interval = 300  # 5 minutes
-        self.last_cleanup = time.time()
+        Such a bucket has refilled completely, which is the same state as having no
+        bucket at all, so removing it does not change any client's limit.
+        """
+        current_time = self._clock()
+        buckets = self._buckets
+        reaped = 0
+        while buckets and reaped < batch_size:
+            bucket_key, (_, last_refill) = next(iter(buckets.items()))
+            if current_time - last_refill < _RATE_LIMIT_WINDOWS[bucket_key[1]]:
+                break
+            del buckets[bucket_key]
+            reaped += 1
+        return reaped
+    
+    async def run_reaper(self):
+        """Periodically reap idle buckets in bounded batches; runs until cancelled"""
+        while True:
+            await asyncio.sleep(self.REAP_INTERVAL)
+            try:
+                reaped = self.reap_idle_buckets(self.REAP_BATCH_SIZE)
+                if reaped:
+                    logger.debug(f"Rate limiter reaped {reaped} idle buckets")
+            except Exception as e:
+                logger.error(f"Rate limiter reaper error: {e}")
     
     def _get_client_id(self, request: Request) -> str:
-        """Get client identifier from request"""
+        """Get client identifier from request (memoized on request.state)"""
+        client_id = getattr(request.state, "rate_limit_client_id", None)
+        if client_id is not None:
+            return client_id
+        
         # Try to get user ID from request state (if authenticated)
         if hasattr(request.state, 'user_id'):
-            return f"user_{request.state.user_id}"
-        
-        # Fall back to IP address
-        client_ip = request.client.host if request.client else "unknown"
-        
-        # Check for forwarded IP headers
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            client_ip = forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            client_ip = real_ip
-        
-        return f"ip_{client_ip}"
-    
-    def _get_rate_limit_key(self, request: Request) -> str:
-        """Determine rate limit category based on request"""
-        path = request.url.path
-        
-        if "/auth/" in path:
-            return "auth"
-        elif "/upload" in path or request.method == "POST" and "/assets/" in path:
-            return "upload"
-        elif "/videos/generate" in path:
-            return "video_generation"
-        elif any(heavy_path in path for heavy_path in ["/videos/", "/templates/customize", "/templates/preview"]):
-            return "api_heavy"
+            client_id = f"user_{request.state.user_id}"
         else:
-            return "default"
-    
-    def _cleanup_old_requests(self):
-        """Clean up old request records"""
-        current_time = time.time()
-        
-        if current_time - self.last_cleanup < self.cleanup_interval:
-            return
-        
-        # Clean up requests older than the longest window
-        max_window = max(config["window"] for config in self.rate_limits.values())
-        cutoff_time = current_time - max_window
+            # Check for forwarded IP headers in the raw ASGI header list,
+            # which avoids building the full case-insensitive Headers mapping
+            forwarded_for = real_ip = None
+            for name, value in request.scope["headers"]:
+                if name == b"x-forwarded-for":
+                    if forwarded_for is None:
+                        forwarded_for = value
+                elif name == b"x-real-ip":
+                    if real_ip is None:
+                        real_ip = value
+            
+            if real_ip:
+                client_ip = real_ip.decode("latin-1")
+            elif forwarded_for:
+                client_ip = forwarded_for.split(b",", 1)[0].strip().decode("latin-1")
+            else:
+                # Fall back to IP address
+                client_ip = request.client.host if request.client else "unknown"
+            
+            client_id = f"ip_{client_ip}"
         
-        for client_id, requests in self._requests.items():
-            # Remove old requests
-            while requests and requests[0] < cutoff_time:
-                requests.popleft()
+        request.state.rate_limit_client_id = client_id
+        return client_id
+    
+    def _get_rate_limit_key(self, request: Request) -> RateLimitCategory:
+        """Determine rate limit category based on request (memoized on request.state)"""
+        rate_limit_key = getattr(request.state, "rate_limit_key", None)
+        if rate_limit_key is not None:
+            return rate_limit_key
         
-        # Remove empty client records
-        empty_clients = [client_id for client_id, requests in self._requests.items() if not requests]
-        for client_id in empty_clients:
-            del self._requests[client_id]
+        match = _RATE_LIMIT_KEY_PATTERN.match(f"{request.method} {request.url.path}")
+        rate_limit_key = RateLimitCategory[match.lastgroup] if match else RateLimitCategory.DEFAULT
         
-        self.last_cleanup = current_time
-        logger.info(f"Rate limiter cleanup completed. Active clients: {len(self._requests)}")
+        request.state.rate_limit_key = rate_limit_key
+        return rate_limit_key
     
     async def check_rate_limit(self, request: Request) -> Optional[JSONResponse]:
         """Check if request should be rate limited"""
         try:
-            # Cleanup old requests periodically
-            self._cleanup_old_requests()
-            
             client_id = self._get_client_id(request)
             rate_limit_key = self._get_rate_limit_key(request)
-            rate_config = self.rate_limits[rate_limit_key]
-            
-            current_time = time.time()
-            window_start = current_time - rate_config["window"]
+            capacity = _RATE_LIMIT_REQUESTS[rate_limit_key]
+            window = _RATE_LIMIT_WINDOWS[rate_limit_key]
+            refill_rate = capacity / window
             
-            # Get client's request history
-            client_requests = self._requests[client_id]
+            current_time = self._clock()
+            bucket_key = (client_id, rate_limit_key)
+            buckets = self._buckets
             
-            # Remove requests outside the current window
-            while client_requests and client_requests[0] < window_start:
-                client_requests.popleft()
+            # Refill the client's bucket for the time elapsed since its last request.
+            # Nothing below awaits, so the read-modify-write is atomic on the event loop.
+            bucket = buckets.get(bucket_key)
+            tokens = _refilled_tokens(bucket, capacity, refill_rate, current_time)
+            if bucket is not None:
+                buckets.move_to_end(bucket_key)
             
             # Check if rate limit exceeded
-            if len(client_requests) >= rate_config["requests"]:
-                # Calculate time until next request is allowed
-                oldest_request = client_requests[0]
-                retry_after = int(oldest_request + rate_config["window"] - current_time)
+            if tokens < 1:
+                buckets[bucket_key] = (tokens, current_time)
                 
-                logger.warning(f"Rate limit exceeded for {client_id} on {rate_limit_key}")
+                # Calculate time until the next token is available
+                retry_after = math.ceil((1 - tokens) / refill_rate)
+                
+                logger.warning(f"Rate limit exceeded for {client_id} on {_RATE_LIMIT_NAMES[rate_limit_key]}")
                 
                 return JSONResponse(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     content={
                         "success": False,
                         "message": "Rate limit exceeded",
-                        "error": f"Too many requests. Limit: {rate_config['requests']} per {rate_config['window']} seconds",
+                        "error": f"Too many requests. Limit: {capacity} per {window} seconds",
                         "retry_after": retry_after
                     },
                     headers={"Retry-After": str(retry_after)}
                 )
             
             # Record this request
-            client_requests.append(current_time)
+            buckets[bucket_key] = (tokens - 1, current_time)
+            if len(buckets) > self.MAX_BUCKETS:
+                buckets.popitem(last=False)
             
             return None  # Request allowed
             
@@ -146,21 +215,21 @@ class RateLimiter:
         try:
             client_id = self._get_client_id(request)
             rate_limit_key = self._get_rate_limit_key(request)
-            rate_config = self.rate_limits[rate_limit_key]
-            
-            current_time = time.time()
-            window_start = current_time - rate_config["window"]
+            capacity = _RATE_LIMIT_REQUESTS[rate_limit_key]
+            window = _RATE_LIMIT_WINDOWS[rate_limit_key]
+            refill_rate = capacity / window
             
-            client_requests = self._requests[client_id]
+            current_time = self._clock()
             
-            # Count requests in current window
-            recent_requests = sum(1 for req_time in client_requests if req_time >= window_start)
+            bucket_key = (client_id, rate_limit_key)
+            bucket = self._buckets.get(bucket_key)
+            tokens = _refilled_tokens(bucket, capacity, refill_rate, current_time)
             
             return {
-                "limit": rate_config["requests"],
-                "remaining": max(0, rate_config["requests"] - recent_requests),
-                "reset_time": int(current_time + rate_config["window"]),
-                "window_seconds": rate_config["window"]
+                "limit": capacity,
+                "remaining": max(0, int(tokens)),
+                "reset_time": int(_MONOTONIC_EPOCH + current_time + (capacity - tokens) / refill_rate),
+                "window_seconds": window
             }
             
         except Exception as e:
@@ -173,43 +242,86 @@ class RateLimiter:
             }
 
 
+# Boolean query string values; other casings fall back to a lower() lookup
+_BOOLEAN_STRINGS = {
+    "true": True, "True": True, "TRUE": True,
+    "false": False, "False": False, "FALSE": False
+}
+
+
+# Compress responses larger than 1KB
+_RESPONSE_COMPRESSION_THRESHOLD: Final[int] = 1024
+
+# Pagination bounds
+_PAGINATION_DEFAULT_LIMIT: Final[int] = 20
+_PAGINATION_MAX_LIMIT: Final[int] = 100
+_PAGINATION_DEFAULT_SKIP: Final[int] = 0
+
+# Media types served with a public Cache-Control header
+_CACHEABLE_MEDIA_TYPES = frozenset({"image/jpeg", "image/png", "video/mp4"})
+
+# Last whole second rendered for X-Timestamp and its string form
+_timestamp_second = 0
+_timestamp_value = "0"
+
+
+def _timestamp_header() -> str:
+    """Current Unix time as a header value, formatted at most once per second"""
+    global _timestamp_second, _timestamp_value
+    
+    now = int(time.time())
+    if now != _timestamp_second:
+        _timestamp_second = now
+        _timestamp_value = str(now)
+    return _timestamp_value
+
+
 class APIOptimizer:
     """API optimization utilities"""
     
-    def __init__(self):
-        self.response_compression_threshold = 1024  # Compress responses larger than 1KB
-        self.pagination_defaults = {
-            "default_limit": 20,
-            "max_limit": 100,
-            "default_skip": 0
-        }
+    __slots__ = ()
     
-    def optimize_pagination(self, skip: int, limit: int) -> Dict[str, int]:
+    @staticmethod
+    def optimize_pagination(skip: int, limit: int) -> Dict[str, int]:
         """Optimize pagination parameters"""
         # Ensure skip is not negative
-        skip = max(0, skip)
+        skip = max(_PAGINATION_DEFAULT_SKIP, skip)
         
         # Ensure limit is within bounds
-        limit = max(1, min(limit, self.pagination_defaults["max_limit"]))
+        limit = max(1, min(limit, _PAGINATION_MAX_LIMIT))
         
         return {"skip": skip, "limit": limit}
     
-    def should_compress_response(self, content_length: int) -> bool:
+    @staticmethod
+    def should_compress_response(content_length: int) -> bool:
         """Determine if response should be compressed"""
-        return content_length > self.response_compression_threshold
+        return content_length > _RESPONSE_COMPRESSION_THRESHOLD
     
     def optimize_query_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize query parameters for better performance"""
+        # Nothing to convert or drop: a plain copy, so callers never alias their input
+        for value in params.values():
+            if value is None or isinstance(value, str):
+                break
+        else:
+            return dict(params)
+        
         optimized = {}
         
         for key, value in params.items():
             if value is not None:
-                # Convert string booleans
-                if isinstance(value, str) and value.lower() in ["true", "false"]:
-                    optimized[key] = value.lower() == "true"
-                # Convert string numbers
-                elif isinstance(value, str) and value.isdigit():
-                    optimized[key] = int(value)
+                if isinstance(value, str):
+                    # Convert string booleans
+                    flag = _BOOLEAN_STRINGS.get(value)
+                    if flag is None and len(value) in (4, 5):
+                        flag = _BOOLEAN_STRINGS.get(value.lower())
+                    if flag is not None:
+                        optimized[key] = flag
+                    # Convert string numbers
+                    elif value.isascii() and value.isdigit():
+                        optimized[key] = int(value)
+                    else:
+                        optimized[key] = value
                 else:
                     optimized[key] = value
         
@@ -218,75 +330,155 @@ class APIOptimizer:
     def add_performance_headers(self, response: Response, processing_time: float):
         """Add performance-related headers to response"""
         response.headers["X-Processing-Time"] = f"{processing_time:.3f}s"
-        response.headers["X-Timestamp"] = str(int(time.time()))
+        response.headers["X-Timestamp"] = _timestamp_header()
         
         # Add cache control headers for static content
-        if hasattr(response, 'media_type') and response.media_type in ['image/jpeg', 'image/png', 'video/mp4']:
+        if getattr(response, 'media_type', None) in _CACHEABLE_MEDIA_TYPES:
             response.headers["Cache-Control"] = "public, max-age=3600"  # 1 hour cache
 
 
+class ResponseTimeWindow:
+    """Sliding window of response times with O(1) average, min and max"""
+    
+    __slots__ = ("size", "samples", "total", "_next_index", "_min_candidates", "_max_candidates")
+    
+    def __init__(self, size: int):
+        self.size = size
+        # Preallocated ring of C doubles, written at _next_index % size
+        self.samples = array("d", [0.0]) * size
+        self.total = 0.0
+        self._next_index = 0
+        # Monotonic deques of (value, index): increasing for min, decreasing for max
+        self._min_candidates: deque = deque()
+        self._max_candidates: deque = deque()
+    
+    def __len__(self) -> int:
+        return min(self._next_index, self.size)
+    
+    def add(self, value: float):
+        """Append a sample, overwriting the oldest once the window is full"""
+        index = self._next_index
+        self._next_index += 1
+        
+        slot = index % self.size
+        if index >= self.size:
+            self.total -= self.samples[slot]
+        self.samples[slot] = value
+        self.total += value
+        
+        oldest_index = index - self.size + 1
+        
+        min_candidates = self._min_candidates
+        while min_candidates and min_candidates[-1][0] >= value:
+            min_candidates.pop()
+        min_candidates.append((value, index))
+        if min_candidates[0][1] < oldest_index:
+            min_candidates.popleft()
+        
+        max_candidates = self._max_candidates
+        while max_candidates and max_candidates[-1][0] <= value:
+            max_candidates.pop()
+        max_candidates.append((value, index))
+        if max_candidates[0][1] < oldest_index:
+            max_candidates.popleft()
+    
+    @property
+    def average(self) -> float:
+        """Mean of the samples in the window"""
+        count = len(self)
+        return self.total / count if count else 0
+    
+    @property
+    def minimum(self) -> float:
+        """Smallest sample in the window"""
+        return self._min_candidates[0][0] if self._min_candidates else 0
+    
+    @property
+    def maximum(self) -> float:
+        """Largest sample in the window"""
+        return self._max_candidates[0][0] if self._max_candidates else 0
+
+
 class PerformanceMonitor:
     """Monitor API performance and collect metrics"""
     
+    __slots__ = (
+        "metrics", "start_time", "_endpoint_ids", "_endpoint_keys",
+        "_request_counts", "_error_counts", "_response_times"
+    )
+    
+    # Response times kept per endpoint; older samples are dropped as new ones arrive
+    RESPONSE_TIME_WINDOW = 1000
+    
     def __init__(self):
-        self.metrics = {
-            "request_count": defaultdict(int),
-            "response_times": defaultdict(list),
-            "error_count": defaultdict(int),
-            "cache_hits": defaultdict(int),
-            "cache_misses": defaultdict(int)
+        # Plain dicts: entries are created explicitly on write so reads never insert
+        self.metrics: Dict[str, Dict[str, Any]] = {
+            "cache_hits": {},
+            "cache_misses": {}
         }
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
+        
+        # Per-endpoint metrics as parallel lists indexed by an interned endpoint id
+        self._endpoint_ids: Dict[str, int] = {}
+        self._endpoint_keys: List[str] = []
+        self._request_counts: List[int] = []
+        self._error_counts: List[int] = []
+        self._response_times: List[ResponseTimeWindow] = []
+    
+    def _register_endpoint(self, key: str) -> int:
+        """Assign the next endpoint id to ``key`` and allocate its metric slots"""
+        endpoint_id = len(self._endpoint_keys)
+        self._endpoint_ids[key] = endpoint_id
+        self._endpoint_keys.append(key)
+        self._request_counts.append(0)
+        self._error_counts.append(0)
+        self._response_times.append(ResponseTimeWindow(self.RESPONSE_TIME_WINDOW))
+        return endpoint_id
     
     def record_request(self, endpoint: str, method: str, response_time: float, status_code: int):
         """Record request metrics"""
         key = f"{method}:{endpoint}"
         
-        self.metrics["request_count"][key] += 1
-        self.metrics["response_times"][key].append(response_time)
+        endpoint_id = self._endpoint_ids.get(key)
+        if endpoint_id is None:
+            endpoint_id = self._register_endpoint(key)
         
-        if status_code >= 400:
-            self.metrics["error_count"][key] += 1
+        self._request_counts[endpoint_id] += 1
+        self._response_times[endpoint_id].add(response_time)
         
-        # Keep only last 1000 response times per endpoint
-        if len(self.metrics["response_times"][key]) > 1000:
-            self.metrics["response_times"][key] = self.metrics["response_times"][key][-1000:]
+        if status_code >= 400:
+            self._error_counts[endpoint_id] += 1
     
     def record_cache_hit(self, cache_type: str):
         """Record cache hit"""
-        self.metrics["cache_hits"][cache_type] += 1
+        cache_hits = self.metrics["cache_hits"]
+        cache_hits[cache_type] = cache_hits.get(cache_type, 0) + 1
     
     def record_cache_miss(self, cache_type: str):
         """Record cache miss"""
-        self.metrics["cache_misses"][cache_type] += 1
+        cache_misses = self.metrics["cache_misses"]
+        cache_misses[cache_type] = cache_misses.get(cache_type, 0) + 1
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics"""
         stats = {
-            "uptime_seconds": time.time() - self.start_time,
-            "total_requests": sum(self.metrics["request_count"].values()),
-            "total_errors": sum(self.metrics["error_count"].values()),
+            "uptime_seconds": time.monotonic() - self.start_time,
+            "total_requests": sum(self._request_counts),
+            "total_errors": sum(self._error_counts),
             "endpoints": {}
         }
         
         # Calculate per-endpoint stats
-        for endpoint, count in self.metrics["request_count"].items():
-            response_times = self.metrics["response_times"][endpoint]
-            
-            if response_times:
-                avg_response_time = sum(response_times) / len(response_times)
-                max_response_time = max(response_times)
-                min_response_time = min(response_times)
-            else:
-                avg_response_time = max_response_time = min_response_time = 0
-            
+        for endpoint, count, error_count, response_times in zip(
+            self._endpoint_keys, self._request_counts, self._error_counts, self._response_times
+        ):
             stats["endpoints"][endpoint] = {
                 "request_count": count,
-                "error_count": self.metrics["error_count"][endpoint],
-                "avg_response_time": round(avg_response_time, 3),
-                "max_response_time": round(max_response_time, 3),
-                "min_response_time": round(min_response_time, 3),
-                "error_rate": round(self.metrics["error_count"][endpoint] / count * 100, 2) if count > 0 else 0
+                "error_count": error_count,
+                "avg_response_time": round(response_times.average, 3),
+                "max_response_time": round(response_times.maximum, 3),
+                "min_response_time": round(response_times.minimum, 3),
+                "error_rate": round(error_count / count * 100, 2) if count > 0 else 0
             }
         
         # Cache statistics
@@ -3,10 +3,13 @@ Simple video generator that creates actual video files
 """
 
 import os
+import asyncio
 import json
-import tempfile
+import shutil
 import subprocess
-from typing import Dict, Any, List
+import tempfile
+from typing import Dict, Any, List, Tuple, Mapping, AsyncIterator
+from types import MappingProxyType
 from pathlib import Path
 import logging
 from PIL import Image, ImageDraw, ImageFont
@@ -15,13 +18,59 @@ import base64
 
 logger = logging.getLogger(__name__)
 
+# Output sizes per aspect ratio, reduced for faster processing
+RESOLUTIONS: Mapping[str, Tuple[int, int]] = MappingProxyType({
+    "16:9": (1280, 720),
+    "9:16": (720, 1280),
+    "1:1": (720, 720),
+    "21:9": (1280, 540)
+})
+
+# Resolved once so generations without FFmpeg skip straight to the HTML preview
+FFMPEG_PATH = shutil.which("ffmpeg")
+
+# x264 speed/quality settings per requested output quality
+X264_QUALITY_ARGS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    # zerolatency drops B-frames and lookahead, only worth it for the fastest preset
+    "low": ("-preset", "ultrafast", "-tune", "zerolatency", "-crf", "30"),
+    "medium": ("-preset", "veryfast", "-crf", "23"),
+    "high": ("-preset", "medium", "-crf", "18"),
+    "ultra": ("-preset", "slow", "-crf", "15")
+})
+
+# Lookup tables from Pillow's full-range YCbCr to the limited (TV) range of yuv420p,
+# so the piped frames already match the output format and FFmpeg has nothing to convert
+_LUMA_TO_LIMITED_RANGE = [16 + (value * 219 + 127) // 255 for value in range(256)]
+_CHROMA_TO_LIMITED_RANGE = [16 + (value * 224 + 127) // 255 for value in range(256)]
+
+# Preview frames are shown at most this large, so there is no point embedding more
+PREVIEW_FRAME_SIZE = (800, 450)
+
+
+def _hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    """Convert a "#rrggbb" color to an RGB tuple, defaulting to white"""
+    if color.startswith("#"):
+        return tuple(int(color[i:i+2], 16) for i in (1, 3, 5))
+    return (255, 255, 255)
+
+
+def _file_size(path: str) -> int:
+    """Size of a file in bytes, or 0 if it does not exist"""
+    try:
+        return Path(path).stat().st_size
+    except FileNotFoundError:
+        return 0
+
 
 class SimpleVideoGenerator:
     """Simple video generator using PIL and FFmpeg"""
     
+    FRAME_QUEUE_SIZE = 8
+    # Seconds allowed for the whole encode, from the first frame written until FFmpeg exits
+    FFMPEG_TIMEOUT = 60
+    
     def __init__(self):
-        self.temp_dir = Path(tempfile.gettempdir()) / "genxvids_temp"
-        self.temp_dir.mkdir(exist_ok=True)
+        self._font_cache: Dict[Tuple[str, int], ImageFont.ImageFont] = {}
     
     async def generate_video(
         self, 
@@ -39,28 +88,22 @@ class SimpleVideoGenerator:
             quality = config.get("quality", "medium")
             
             # Get resolution
-            resolution = self._get_resolution(aspect_ratio)
-            width, height = resolution["width"], resolution["height"]
+            width, height = self._get_resolution(aspect_ratio)
             
             # Create output directory
             output_dir = Path(output_path).parent
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Generate frames for all scenes
-            all_frames = []
+            # Count frames up front; they are rendered while streaming to FFmpeg
             total_duration = 0
+            frame_count = 0
             
-            for scene_idx, scene in enumerate(scenes):
+            for scene in scenes:
                 scene_duration = scene.get("duration", 5)
                 total_duration += scene_duration
-                
-                # Generate frames for this scene
-                scene_frames = await self._generate_scene_frames(
-                    scene, width, height, fps, scene_duration
-                )
-                all_frames.extend(scene_frames)
+                frame_count += int(scene_duration * fps)
             
-            if not all_frames:
+            if not frame_count:
                 return {
                     "success": False,
                     "error": "No frames generated"
@@ -69,11 +112,11 @@ class SimpleVideoGenerator:
             # Try to create video with FFmpeg
             try:
                 video_path = await self._create_video_with_ffmpeg(
-                    all_frames, output_path, fps, width, height
+                    scenes, output_path, fps, width, height, quality
                 )
                 
                 # Get file size
-                file_size = os.path.getsize(video_path) if os.path.exists(video_path) else 0
+                file_size = _file_size(video_path)
                 
                 return {
                     "success": True,
@@ -86,7 +129,7 @@ class SimpleVideoGenerator:
                         "fps": fps,
                         "quality": quality,
                         "aspectRatio": aspect_ratio,
-                        "frameCount": len(all_frames)
+                        "frameCount": frame_count
                     }
                 }
                 
@@ -95,7 +138,7 @@ class SimpleVideoGenerator:
                 
                 # Fallback to HTML preview
                 html_path = await self._create_html_preview(
-                    scenes, config, output_path, all_frames
+                    scenes, config, output_path, frame_count
                 )
                 
                 return {
@@ -105,12 +148,12 @@ class SimpleVideoGenerator:
                     "metadata": {
                         "duration": total_duration,
                         "resolution": f"{width}x{height}",
-                        "fileSize": os.path.getsize(html_path) if os.path.exists(html_path) else 0,
+                        "fileSize": _file_size(html_path),
                         "format": "html",
                         "fps": fps,
                         "quality": quality,
                         "aspectRatio": aspect_ratio,
-                        "frameCount": len(all_frames)
+                        "frameCount": frame_count
                     },
                     "message": "Video generated as HTML preview. Install FFmpeg for MP4 generation."
                 }
@@ -121,9 +164,20 @@ class SimpleVideoGenerator:
                 "success": False,
                 "error": str(e)
             }
-        finally:
-            # Clean up temporary files
-            await self._cleanup_temp_files()
+    
+    async def _iter_frames(
+        self, 
+        scenes: List[Dict[str, Any]], 
+        width: int, 
+        height: int, 
+        fps: int
+    ) -> AsyncIterator[bytes]:
+        """Yield raw YUV frames of all scenes in playback order"""
+        for scene in scenes:
+            async for frame in self._generate_scene_frames(
+                scene, width, height, fps, scene.get("duration", 5)
+            ):
+                yield frame
     
     async def _generate_scene_frames(
         self, 
@@ -132,28 +186,71 @@ class SimpleVideoGenerator:
         height: int, 
         fps: int, 
         duration: float
-    ) -> List[str]:
-        """Generate frames for a single scene"""
-        frames = []
+    ) -> AsyncIterator[bytes]:
+        """Generate raw YUV frames for a single scene"""
         frame_count = int(duration * fps)
         
-        for frame_idx in range(frame_count):
-            # Create frame image
-            frame_image = Image.new('RGB', (width, height), color='black')
-            draw = ImageDraw.Draw(frame_image)
-            
-            # Render elements
-            for element in scene.get("elements", []):
-                await self._render_element(draw, element, width, height, frame_image)
-            
-            # Save frame
-            frame_path = self.temp_dir / f"frame_{len(frames):06d}.png"
-            frame_image.save(frame_path, "PNG")
-            frames.append(str(frame_path))
+        if not frame_count:
+            return
         
-        return frames
+        elements = self._normalize_elements(scene.get("elements", []))
+        
+        # Rendering does not depend on the frame index, so every frame of a scene is the same
+        raw = await asyncio.to_thread(
+            self._render_encoder_frame, elements, width, height
+        )
+        for _ in range(frame_count):
+            yield raw
+    
+    def _normalize_elements(
+        self, 
+        elements: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Resolve element colors to RGB tuples once per scene"""
+        normalized = []
+        for element in elements:
+            properties = dict(element.get("properties", {}))
+            element_type = element.get("type", "text")
+            if element_type == "text":
+                properties["color_rgb"] = _hex_to_rgb(properties.get("color", "#ffffff"))
+            elif element_type == "shape":
+                properties["fill_color_rgb"] = _hex_to_rgb(properties.get("fillColor", "#ffffff"))
+            normalized.append({**element, "properties": properties})
+        return normalized
     
-    async def _render_element(
+    def _render_frame(
+        self, 
+        elements: List[Dict[str, Any]], 
+        width: int, 
+        height: int
+    ) -> Image.Image:
+        """Render all elements onto a fresh frame"""
+        frame_image = Image.new('RGB', (width, height), color='black')
+        draw = ImageDraw.Draw(frame_image)
+        
+        for element in elements:
+            self._render_element(draw, element, width, height, frame_image)
+        
+        return frame_image
+    
+    def _render_encoder_frame(
+        self, 
+        elements: List[Dict[str, Any]], 
+        width: int, 
+        height: int
+    ) -> bytes:
+        """Render a frame as planar limited-range YUV 4:2:0 bytes for FFmpeg"""
+        # Converting here halves the bytes piped per frame and spares
+        # FFmpeg an RGB->YUV conversion on every repeated static frame
+        y, cb, cr = self._render_frame(elements, width, height).convert("YCbCr").split()
+        chroma_size = (width // 2, height // 2)
+        return b"".join((
+            y.point(_LUMA_TO_LIMITED_RANGE).tobytes(),
+            cb.resize(chroma_size, Image.BOX).point(_CHROMA_TO_LIMITED_RANGE).tobytes(),
+            cr.resize(chroma_size, Image.BOX).point(_CHROMA_TO_LIMITED_RANGE).tobytes()
+        ))
+    
+    def _render_element(
         self, 
         draw: ImageDraw.Draw, 
         element: Dict[str, Any], 
@@ -174,13 +271,13 @@ class SimpleVideoGenerator:
         h = int((size["height"] / 100) * canvas_height)
         
         if element_type == "text":
-            await self._render_text(draw, properties, x, y, w, h)
+            self._render_text(draw, properties, x, y, w, h)
         elif element_type == "shape":
-            await self._render_shape(draw, properties, x, y, w, h)
+            self._render_shape(draw, properties, x, y, w, h)
         elif element_type == "image":
-            await self._render_image_element(image, properties, x, y, w, h)
+            self._render_image_element(image, properties, x, y, w, h)
     
-    async def _render_text(
+    def _render_text(
         self, 
         draw: ImageDraw.Draw, 
         properties: Dict[str, Any], 
@@ -192,44 +289,34 @@ class SimpleVideoGenerator:
         """Render text element"""
         text = properties.get("text", "Sample Text")
         font_size = properties.get("fontSize", 24)
-        color = properties.get("color", "#ffffff")
+        color = properties["color_rgb"]
         font_family = properties.get("fontFamily", "Arial")
         
-        # Convert hex color to RGB
-        if color.startswith("#"):
-            color = tuple(int(color[i:i+2], 16) for i in (1, 3, 5))
-        else:
-            color = (255, 255, 255)  # Default white
-        
-        # Try to load font
-        try:
-            # Try to use a system font
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
-        except:
-            try:
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
+        font = self._load_font(font_family, font_size)
         
-        # Simple text wrapping
-        words = text.split()
+        # Simple text wrapping, measuring each word only once
+        space_width = draw.textlength(" ", font=font)
         lines = []
-        current_line = ""
+        current_words = []
+        current_width = 0.0
         
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            text_width = bbox[2] - bbox[0]
+        for word in text.split():
+            word_width = draw.textlength(word, font=font)
+            line_width = current_width + space_width + word_width
             
-            if text_width <= w:
-                current_line = test_line
+            if current_words and line_width > w:
+                lines.append(" ".join(current_words))
+                current_words = [word]
+                current_width = word_width
+            elif current_words:
+                current_words.append(word)
+                current_width = line_width
             else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
+                current_words = [word]
+                current_width = word_width
         
-        if current_line:
-            lines.append(current_line)
+        if current_words:
+            lines.append(" ".join(current_words))
         
         # Draw lines
         line_height = font_size + 5
@@ -238,7 +325,27 @@ class SimpleVideoGenerator:
             if line_y + line_height <= y + h:  # Don't draw outside bounds
                 draw.text((x, line_y), line, fill=color, font=font)
     
-    async def _render_shape(
+    def _load_font(self, font_family: str, font_size: int) -> ImageFont.ImageFont:
+        """Load a font once per family and size"""
+        key = (font_family, font_size)
+        font = self._font_cache.get(key)
+        if font is not None:
+            return font
+        
+        # Try system font locations before falling back to PIL's default
+        for font_path in ("/System/Library/Fonts/Arial.ttf", "arial.ttf"):
+            try:
+                font = ImageFont.truetype(font_path, font_size)
+                break
+            except OSError:
+                continue
+        else:
+            font = ImageFont.load_default()
+        
+        self._font_cache[key] = font
+        return font
+    
+    def _render_shape(
         self, 
         draw: ImageDraw.Draw, 
         properties: Dict[str, Any], 
@@ -249,20 +356,14 @@ class SimpleVideoGenerator:
     ):
         """Render shape element"""
         shape_type = properties.get("shapeType", "rectangle")
-        fill_color = properties.get("fillColor", "#ffffff")
-        
-        # Convert hex color to RGB
-        if fill_color.startswith("#"):
-            fill_color = tuple(int(fill_color[i:i+2], 16) for i in (1, 3, 5))
-        else:
-            fill_color = (255, 255, 255)
+        fill_color = properties["fill_color_rgb"]
         
         if shape_type == "rectangle":
             draw.rectangle([x, y, x + w, y + h], fill=fill_color)
         elif shape_type == "circle":
             draw.ellipse([x, y, x + w, y + h], fill=fill_color)
     
-    async def _render_image_element(
+    def _render_image_element(
         self, 
         canvas: Image.Image, 
         properties: Dict[str, Any], 
@@ -286,83 +387,147 @@ class SimpleVideoGenerator:
     
     async def _create_video_with_ffmpeg(
         self, 
-        frame_paths: List[str], 
+        scenes: List[Dict[str, Any]], 
         output_path: str, 
         fps: int, 
         width: int, 
-        height: int
+        height: int,
+        quality: str = "medium"
     ) -> str:
-        """Create video using FFmpeg"""
-        
-        # Create a text file listing all frames
-        frame_list_path = self.temp_dir / "frame_list.txt"
-        with open(frame_list_path, 'w') as f:
-            for frame_path in frame_paths:
-                f.write(f"file '{frame_path}'\n")
-                f.write(f"duration {1/fps}\n")
-        
-        # Try different FFmpeg commands
-        ffmpeg_commands = [
-            ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(frame_list_path), 
-             "-vf", f"fps={fps}", "-c:v", "libx264", "-pix_fmt", "yuv420p", output_path],
-            ["ffmpeg", "-y", "-r", str(fps), "-i", str(self.temp_dir / "frame_%06d.png"), 
-             "-c:v", "libx264", "-pix_fmt", "yuv420p", output_path]
+        """Create video by piping raw YUV frames into FFmpeg"""
+        if FFMPEG_PATH is None:
+            raise Exception("FFmpeg is not installed")
+        
+        cmd = [
+            FFMPEG_PATH, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "yuv420p", "-s", f"{width}x{height}",
+            "-r", str(fps), "-i", "-",
+            "-c:v", "libx264",
+            *X264_QUALITY_ARGS.get(quality, X264_QUALITY_ARGS["medium"]),
+            "-threads", "0",
+            "-pix_fmt", "yuv420p", output_path
         ]
         
-        for cmd in ffmpeg_commands:
+        # FFmpeg writes stderr to a file, so it can never block on a full pipe
+        # that nobody reads while frames are being written to stdin
+        with tempfile.TemporaryFile() as stderr_file:
             try:
-                result = subprocess.run(
+                process = subprocess.Popen(
                     cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=60
+                    stdin=subprocess.PIPE, 
+                    stderr=stderr_file
                 )
-                
-                if result.returncode == 0 and os.path.exists(output_path):
-                    logger.info("Video created successfully with FFmpeg")
-                    return output_path
-                else:
-                    logger.warning(f"FFmpeg command failed: {result.stderr}")
-                    
-            except subprocess.TimeoutExpired:
-                logger.warning("FFmpeg command timed out")
             except FileNotFoundError:
                 logger.warning("FFmpeg not found")
-            except Exception as e:
-                logger.warning(f"FFmpeg error: {e}")
+                raise Exception("FFmpeg is not installed")
+            
+            # Render ahead of the encoder so FFmpeg works while frames are drawn
+            frame_queue: asyncio.Queue = asyncio.Queue(maxsize=self.FRAME_QUEUE_SIZE)
+            producer = asyncio.create_task(
+                self._queue_frames(frame_queue, scenes, width, height, fps)
+            )
+            
+            try:
+                await asyncio.wait_for(
+                    self._encode_frames(process, frame_queue), timeout=self.FFMPEG_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                logger.warning("FFmpeg command timed out")
+                raise Exception("FFmpeg command timed out")
+            finally:
+                producer.cancel()
+                # Killing FFmpeg also unblocks a worker thread stuck writing or waiting
+                if process.poll() is None:
+                    process.kill()
+                    await asyncio.to_thread(process.wait)
+                if not process.stdin.closed:
+                    try:
+                        process.stdin.close()
+                    except OSError:
+                        # BrokenPipeError: FFmpeg is gone, nothing left to flush
+                        pass
+            
+            if process.returncode == 0 and os.path.exists(output_path):
+                logger.info("Video created successfully with FFmpeg")
+                return output_path
+            
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
         
-        raise Exception("All FFmpeg attempts failed")
+        logger.warning(f"FFmpeg command failed: {stderr.decode(errors='replace')}")
+        raise Exception("FFmpeg encoding failed")
+    
+    async def _encode_frames(self, process: subprocess.Popen, frame_queue: asyncio.Queue):
+        """Write queued frames to FFmpeg's stdin, then wait for it to exit"""
+        loop = asyncio.get_running_loop()
+        try:
+            while (frame := await frame_queue.get()) is not None:
+                if isinstance(frame, Exception):
+                    raise frame
+                await loop.run_in_executor(None, process.stdin.write, frame)
+            await loop.run_in_executor(None, process.stdin.close)
+        except BrokenPipeError:
+            # FFmpeg exited early; its stderr explains why
+            pass
+        await asyncio.to_thread(process.wait)
+    
+    async def _queue_frames(
+        self, 
+        frame_queue: asyncio.Queue, 
+        scenes: List[Dict[str, Any]], 
+        width: int, 
+        height: int, 
+        fps: int
+    ):
+        """Feed rendered frames to the encoder queue, ending with None"""
+        try:
+            async for frame in self._iter_frames(scenes, width, height, fps):
+                await frame_queue.put(frame)
+        except Exception as e:
+            await frame_queue.put(e)
+        else:
+            await frame_queue.put(None)
     
     async def _create_html_preview(
         self, 
         scenes: List[Dict[str, Any]], 
         config: Dict[str, Any], 
         output_path: str,
-        frame_paths: List[str]
+        frame_count: int
     ) -> str:
-        """Create HTML preview with frame images"""
+        """Create HTML preview with sampled frame images"""
         html_path = output_path.replace('.mp4', '.html')
         
-        # Convert first few frames to base64 for preview
-        frame_data = []
-        max_frames = min(10, len(frame_paths))  # Limit to 10 frames for HTML size
+        aspect_ratio = config.get("aspect_ratio", "16:9")
+        width, height = self._get_resolution(aspect_ratio)
+        fps = config.get("fps", 30)
+        
+        # Render a sample of frames to downsized base64 JPEGs for preview,
+        # encoding in worker threads while later frames are still rendered
+        max_frames = min(10, frame_count)  # Limit to 10 frames for HTML size
+        sampled = range(0, frame_count, max(1, frame_count // max_frames))[:max_frames]
+        sampled_groups = []
+        encode_tasks = []
+        
+        async for frame_indices, frame in self._render_sampled_frames(
+            scenes, width, height, fps, sampled
+        ):
+            sampled_groups.append(frame_indices)
+            encode_tasks.append(asyncio.create_task(asyncio.to_thread(
+                self._encode_preview_frame, frame
+            )))
         
-        for i in range(0, len(frame_paths), max(1, len(frame_paths) // max_frames)):
-            if len(frame_data) >= max_frames:
-                break
-                
-            try:
-                with open(frame_paths[i], 'rb') as f:
-                    img_data = base64.b64encode(f.read()).decode()
-                    frame_data.append(f"data:image/png;base64,{img_data}")
-            except Exception as e:
-                logger.warning(f"Failed to encode frame {i}: {e}")
+        frame_data = []
+        encoded_frames = await asyncio.gather(*encode_tasks, return_exceptions=True)
+        for frame_indices, encoded in zip(sampled_groups, encoded_frames):
+            if isinstance(encoded, Exception):
+                logger.warning(f"Failed to encode frame {frame_indices[0]}: {encoded}")
+            else:
+                frame_data.extend([encoded] * len(frame_indices))
         
-        aspect_ratio = config.get("aspect_ratio", "16:9")
-        resolution = self._get_resolution(aspect_ratio)
         total_duration = sum(scene.get("duration", 0) for scene in scenes)
         
-        html_content = f"""
+        html_parts = [f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -392,8 +557,8 @@ class SimpleVideoGenerator:
             text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
         }}
         .video-container {{
-            width: {min(resolution['width'], 800)}px;
-            height: {min(resolution['height'], 450)}px;
+            width: {min(width, 800)}px;
+            height: {min(height, 450)}px;
             max-width: 100%;
             margin: 0 auto 30px;
             background: #000;
@@ -506,7 +671,7 @@ class SimpleVideoGenerator:
                 </div>
                 <div class="info-item">
                     <div class="info-label">Resolution</div>
-                    <div class="info-value">{resolution['width']}×{resolution['height']}</div>
+                    <div class="info-value">{width}×{height}</div>
                 </div>
                 <div class="info-item">
                     <div class="info-label">Scenes</div>
@@ -514,20 +679,20 @@ class SimpleVideoGenerator:
                 </div>
                 <div class="info-item">
                     <div class="info-label">Frames</div>
-                    <div class="info-value">{len(frame_paths)}</div>
+                    <div class="info-value">{frame_count}</div>
                 </div>
             </div>
         </div>
         
         <div class="video-container" id="videoContainer">
-"""
+"""]
         
         # Add frame images
         for i, frame_data_url in enumerate(frame_data):
             active_class = " active" if i == 0 else ""
-            html_content += f'            <img class="frame{active_class}" src="{frame_data_url}" alt="Frame {i+1}">\n'
+            html_parts.append(f'            <img class="frame{active_class}" src="{frame_data_url}" alt="Frame {i+1}">\n')
         
-        html_content += f"""        </div>
+        html_parts.append(f"""        </div>
         
         <div class="progress-bar">
             <div class="progress-fill" id="progressFill"></div>
@@ -548,7 +713,7 @@ class SimpleVideoGenerator:
         </div>
         
         <div class="footer">
-            <p>Generated by GenXvids Platform | {len(frame_paths)} frames processed</p>
+            <p>Generated by GenXvids Platform | {frame_count} frames processed</p>
         </div>
     </div>
 
@@ -606,29 +771,44 @@ class SimpleVideoGenerator:
         }}, 1000);
     </script>
 </body>
-</html>"""
+</html>""")
         
         with open(html_path, 'w') as f:
-            f.write(html_content)
+            f.writelines(html_parts)
         
         return html_path
     
-    async def _cleanup_temp_files(self):
-        """Clean up temporary files"""
-        try:
-            import shutil
-            if self.temp_dir.exists():
-                shutil.rmtree(self.temp_dir)
-                self.temp_dir.mkdir(exist_ok=True)
-        except Exception as e:
-            logger.warning(f"Failed to cleanup temp files: {e}")
+    async def _render_sampled_frames(
+        self, 
+        scenes: List[Dict[str, Any]], 
+        width: int, 
+        height: int, 
+        fps: int, 
+        indices: range
+    ) -> AsyncIterator[Tuple[List[int], Image.Image]]:
+        """Render only the requested frames, yielding each distinct frame with its indices"""
+        scene_start = 0
+        for scene in scenes:
+            scene_end = scene_start + int(scene.get("duration", 5) * fps)
+            scene_indices = [i for i in indices if scene_start <= i < scene_end]
+            scene_start = scene_end
+            if not scene_indices:
+                continue
+            
+            # Every frame of a scene is the same, so render it once
+            elements = self._normalize_elements(scene.get("elements", []))
+            yield scene_indices, await asyncio.to_thread(
+                self._render_frame, elements, width, height
+            )
+    
+    def _encode_preview_frame(self, image: Image.Image) -> str:
+        """Encode a frame as a downsized JPEG data URL"""
+        image.thumbnail(PREVIEW_FRAME_SIZE)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=75, optimize=True)
+        img_data = base64.b64encode(buffer.getvalue()).decode()
+        return f"data:image/jpeg;base64,{img_data}"
     
-    def _get_resolution(self, aspect_ratio: str) -> Dict[str, int]:
-        """Get resolution based on aspect ratio"""
-        resolutions = {
-            "16:9": {"width": 1280, "height": 720},  # Reduced for faster processing
-            "9:16": {"width": 720, "height": 1280},
-            "1:1": {"width": 720, "height": 720},
-            "21:9": {"width": 1280, "height": 540}
-        }
-        return resolutions.get(aspect_ratio, resolutions["16:9"])
+    def _get_resolution(self, aspect_ratio: str) -> Tuple[int, int]:
+        """Get (width, height) based on aspect ratio"""
+        return RESOLUTIONS.get(aspect_ratio, RESOLUTIONS["16:9"])
@@ -3,372 +3,418 @@ Template customization engine for dynamic parameter modification
 """
 
 from typing import Dict, Any, List, Optional
-import json
-import copy
-from app.schemas.template import TemplateConfig, Scene, SceneElement
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Customization options per element type. These are shared between calls,
+# so callers must treat them as read-only.
+_BASE_OPTIONS = {
+    "position": {
+        "x": {"type": "number", "min": 0, "max": 100, "description": "X position (%)"},
+        "y": {"type": "number", "min": 0, "max": 100, "description": "Y position (%)"}
+    },
+    "size": {
+        "width": {"type": "number", "min": 1, "max": 100, "description": "Width (%)"},
+        "height": {"type": "number", "min": 1, "max": 100, "description": "Height (%)"}
+    }
+}
 
-class TemplateCustomizer:
-    """Engine for customizing template parameters dynamically"""
+_TEXT_OPTIONS = {
+    **_BASE_OPTIONS,
+    "properties": {
+        "text": {"type": "string", "description": "Text content"},
+        "fontSize": {"type": "number", "min": 8, "max": 200, "description": "Font size"},
+        "fontFamily": {"type": "string", "description": "Font family"},
+        "color": {"type": "color", "description": "Text color"},
+        "textAlign": {"type": "select", "options": ["left", "center", "right"], "description": "Text alignment"},
+        "fontWeight": {"type": "select", "options": ["normal", "bold", "100", "200", "300", "400", "500", "600", "700", "800", "900"], "description": "Font weight"}
+    }
+}
+
+_IMAGE_OPTIONS = {
+    **_BASE_OPTIONS,
+    "properties": {
+        "src": {"type": "string", "description": "Image source URL"},
+        "opacity": {"type": "number", "min": 0, "max": 1, "description": "Image opacity"},
+        "filter": {"type": "string", "description": "CSS filter effects"}
+    }
+}
+
+_SHAPE_OPTIONS = {
+    **_BASE_OPTIONS,
+    "properties": {
+        "shapeType": {"type": "select", "options": ["rectangle", "circle", "triangle"], "description": "Shape type"},
+        "fillColor": {"type": "color", "description": "Fill color"},
+        "strokeColor": {"type": "color", "description": "Stroke color"},
+        "strokeWidth": {"type": "number", "min": 0, "max": 20, "description": "Stroke width"}
+    }
+}
+
+_OPTIONS_BY_TYPE = {
+    "text": _TEXT_OPTIONS,
+    "image": _IMAGE_OPTIONS,
+    "shape": _SHAPE_OPTIONS
+}
+
+_ASPECT_RATIO_ORDER = ["16:9", "9:16", "1:1", "21:9"]
+_VALID_ASPECT_RATIOS = frozenset(_ASPECT_RATIO_ORDER)
+_INVALID_ASPECT_RATIO_ERROR = f"Invalid aspect ratio. Must be one of: {_ASPECT_RATIO_ORDER}"
+
+# Keys of a customizations dict that customize_template acts on
+_CUSTOMIZATION_KEYS = frozenset({"duration", "aspect_ratio", "default_style", "elements", "scenes"})
+
+# Numeric range checks as (key, lo, hi, error) tuples
+_PROPERTY_RANGES = {
+    "text": (("fontSize", 8, 200, "Font size must be between 8 and 200"),),
+    "image": (("opacity", 0, 1, "Opacity must be between 0 and 1"),)
+}
+
+_POSITION_RANGES = (
+    ("x", 0, 100, "Position x must be between 0 and 100"),
+    ("y", 0, 100, "Position y must be between 0 and 100")
+)
+
+_SIZE_RANGES = (
+    ("width", 1, 100, "Size width must be between 1 and 100"),
+    ("height", 1, 100, "Size height must be between 1 and 100")
+)
+
+
+def _check_ranges(values: Dict[str, Any], ranges: tuple, errors: List[str]) -> None:
+    """Append an error for each present value that is not a number within its range"""
+    for key, lo, hi, error in ranges:
+        if key in values:
+            value = values[key]
+            if not isinstance(value, (int, float)) or value < lo or value > hi:
+                errors.append(error)
+
+
+def customize_template(
+    template_config: Dict[str, Any],
+    customizations: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Apply customizations to a template configuration
     
-    @staticmethod
-    def customize_template(
-        template_config: Dict[str, Any],
-        customizations: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Apply customizations to a template configuration
+    Args:
+        template_config: Original template configuration
+        customizations: Dictionary of customizations to apply
         
-        Args:
-            template_config: Original template configuration
-            customizations: Dictionary of customizations to apply
-            
-        Returns:
-            Customized template configuration
-        """
-        try:
-            # Deep copy to avoid modifying original
-            customized_config = copy.deepcopy(template_config)
-            
-            # Apply global customizations
-            if "duration" in customizations:
-                customized_config["duration"] = customizations["duration"]
-                # Adjust scene durations proportionally
-                TemplateCustomizer._adjust_scene_durations(
-                    customized_config, customizations["duration"]
-                )
-            
-            if "aspect_ratio" in customizations:
-                customized_config["aspect_ratio"] = customizations["aspect_ratio"]
-            
-            if "default_style" in customizations:
-                customized_config["default_style"] = customizations["default_style"]
-            
-            # Apply element-specific customizations
-            if "elements" in customizations:
-                TemplateCustomizer._customize_elements(
-                    customized_config, customizations["elements"]
-                )
-            
-            # Apply scene-specific customizations
-            if "scenes" in customizations:
-                TemplateCustomizer._customize_scenes(
-                    customized_config, customizations["scenes"]
-                )
-            
+    Returns:
+        Customized template configuration. Parts that are not customized
+        are shared with template_config, so treat the result as read-only.
+    """
+    try:
+        # Copy only the nodes that change so the original is never modified
+        customized_config = {**template_config}
+        
+        # Nothing to apply, e.g. default previews
+        if _CUSTOMIZATION_KEYS.isdisjoint(customizations):
             return customized_config
-            
-        except Exception as e:
-            logger.error(f"Template customization failed: {str(e)}")
-            raise ValueError(f"Failed to customize template: {str(e)}")
-    
-    @staticmethod
-    def _adjust_scene_durations(config: Dict[str, Any], new_total_duration: float):
-        """Adjust scene durations proportionally to match new total duration"""
-        if "scenes" not in config:
-            return
         
-        scenes = config["scenes"]
-        if not scenes:
-            return
+        # Apply global customizations
+        scale_factor = None
+        if "duration" in customizations:
+            customized_config["duration"] = customizations["duration"]
+            # Adjust scene durations proportionally
+            scale_factor = _duration_scale_factor(
+                customized_config.get("scenes"), customizations["duration"]
+            )
+        
+        if "aspect_ratio" in customizations:
+            customized_config["aspect_ratio"] = customizations["aspect_ratio"]
+        
+        if "default_style" in customizations:
+            customized_config["default_style"] = customizations["default_style"]
         
-        # Calculate current total duration
-        current_total = sum(scene.get("duration", 0) for scene in scenes)
-        if current_total <= 0:
-            return
+        # Apply duration scaling, element and scene customizations in one pass
+        _apply_scene_customizations(
+            customized_config,
+            scale_factor,
+            customizations.get("elements") or {},
+            customizations.get("scenes") or {}
+        )
         
-        # Calculate scaling factor
-        scale_factor = new_total_duration / current_total
+        return customized_config
         
-        # Apply scaling to each scene
-        for scene in scenes:
-            if "duration" in scene:
-                scene["duration"] = scene["duration"] * scale_factor
+    except Exception as e:
+        logger.error(f"Template customization failed: {str(e)}")
+        raise ValueError(f"Failed to customize template: {str(e)}")
+
+
+def _adjust_scene_durations(config: Dict[str, Any], new_total_duration: float):
+    """Adjust scene durations proportionally to match new total duration"""
+    scale_factor = _duration_scale_factor(
+        config.get("scenes"), new_total_duration
+    )
+    _apply_scene_customizations(config, scale_factor, {}, {})
+
+
+def _duration_scale_factor(
+    scenes: Optional[List[Dict[str, Any]]],
+    new_total_duration: float
+) -> Optional[float]:
+    """Factor that scales scene durations to a new total, or None if they cannot be scaled"""
+    if not scenes:
+        return None
+    
+    # Calculate current total duration
+    current_total = 0
+    for scene in scenes:
+        current_total += scene.get("duration", 0)
+    if current_total <= 0:
+        return None
     
-    @staticmethod
-    def _customize_elements(config: Dict[str, Any], element_customizations: Dict[str, Any]):
-        """Apply element-specific customizations"""
-        if "scenes" not in config:
-            return
+    return new_total_duration / current_total
+
+
+def _apply_scene_customizations(
+    config: Dict[str, Any],
+    scale_factor: Optional[float],
+    element_customizations: Dict[str, Any],
+    scene_customizations: Dict[str, Any]
+):
+    """Scale durations and apply element and scene customizations in a single walk"""
+    scenes = config.get("scenes")
+    if not scenes or (scale_factor is None and not element_customizations and not scene_customizations):
+        return
+    
+    customized_scenes = []
+    for scene in scenes:
+        updates = {}
         
-        for scene in config["scenes"]:
-            if "elements" not in scene:
-                continue
-            
-            for element in scene["elements"]:
+        # Scale scene duration
+        if scale_factor is not None and "duration" in scene:
+            updates["duration"] = scene["duration"] * scale_factor
+        
+        # Apply element-specific customizations
+        if element_customizations:
+            elements = []
+            changed = False
+            for element in scene.get("elements") or ():
                 element_id = element.get("id")
                 if element_id in element_customizations:
                     customization = element_customizations[element_id]
-                    TemplateCustomizer._apply_element_customization(element, customization)
-    
-    @staticmethod
-    def _apply_element_customization(element: Dict[str, Any], customization: Dict[str, Any]):
-        """Apply customization to a specific element"""
-        # Update element properties
-        if "properties" in customization:
-            if "properties" not in element:
-                element["properties"] = {}
-            element["properties"].update(customization["properties"])
-        
-        # Update position
-        if "position" in customization:
-            element["position"] = customization["position"]
+                    element = _apply_element_customization(element, customization)
+                    changed = True
+                elements.append(element)
+            
+            if changed:
+                updates["elements"] = elements
         
-        # Update size
-        if "size" in customization:
-            element["size"] = customization["size"]
+        # Apply scene-specific customizations (duration, type, transitions)
+        scene_id = scene.get("id")
+        if scene_id in scene_customizations:
+            customization = scene_customizations[scene_id]
+            for key in ("duration", "type", "transitions"):
+                if key in customization:
+                    updates[key] = customization[key]
         
-        # Update animations
-        if "animations" in customization:
-            element["animations"] = customization["animations"]
+        customized_scenes.append({**scene, **updates} if updates else scene)
+    
+    config["scenes"] = customized_scenes
+
+
+def _apply_element_customization(
+    element: Dict[str, Any],
+    customization: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Return a copy of an element with a customization applied"""
+    element = {**element}
+    
+    # Update element properties
+    if "properties" in customization:
+        element["properties"] = {
+            **element.get("properties", {}),
+            **customization["properties"]
+        }
+    
+    # Update position
+    if "position" in customization:
+        element["position"] = customization["position"]
+    
+    # Update size
+    if "size" in customization:
+        element["size"] = customization["size"]
     
-    @staticmethod
-    def _customize_scenes(config: Dict[str, Any], scene_customizations: Dict[str, Any]):
-        """Apply scene-specific customizations"""
-        if "scenes" not in config:
-            return
+    # Update animations
+    if "animations" in customization:
+        element["animations"] = customization["animations"]
+    
+    return element
+
+
+def get_customizable_elements(template_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Extract all customizable elements from a template
+    
+    Returns:
+        List of customizable element information
+    """
+    customizable_elements = []
+    customizable_element_ids = frozenset(template_config.get("customizable_elements") or ())
+    
+    for scene in template_config.get("scenes") or ():
+        for element in scene.get("elements") or ():
+            element_id = element.get("id")
+            if element_id in customizable_element_ids:
+                customizable_elements.append({
+                    "id": element_id,
+                    "type": element.get("type"),
+                    "scene_id": scene.get("id"),
+                    "current_properties": element.get("properties", {}),
+                    "position": element.get("position", {}),
+                    "size": element.get("size", {}),
+                    "customization_options": _get_element_customization_options(element)
+                })
+    
+    return customizable_elements
+
+
+def _get_element_customization_options(element: Dict[str, Any]) -> Dict[str, Any]:
+    """Get available customization options for an element based on its type"""
+    return _OPTIONS_BY_TYPE.get(element.get("type"), _BASE_OPTIONS)
+
+
+def validate_customizations(
+    template_config: Dict[str, Any],
+    customizations: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Validate customizations against template configuration
+    
+    Returns:
+        Dictionary with validation results
+    """
+    errors = []
+    warnings = []
+    
+    try:
+        customizable_element_ids = frozenset(template_config.get("customizable_elements") or ())
         
-        for scene in config["scenes"]:
-            scene_id = scene.get("id")
-            if scene_id in scene_customizations:
-                customization = scene_customizations[scene_id]
-                
-                # Update scene duration
-                if "duration" in customization:
-                    scene["duration"] = customization["duration"]
+        # Validate element customizations
+        if "elements" in customizations:
+            element_index = _build_element_index(template_config)
+            
+            for element_id, element_customization in customizations["elements"].items():
+                if element_id not in customizable_element_ids:
+                    warnings.append(f"Element '{element_id}' is not marked as customizable")
                 
-                # Update scene type
-                if "type" in customization:
-                    scene["type"] = customization["type"]
+                # Find the element in the template
+                element = element_index.get(element_id)
+                if not element:
+                    errors.append(f"Element '{element_id}' not found in template")
+                    continue
                 
-                # Update transitions
-                if "transitions" in customization:
-                    scene["transitions"] = customization["transitions"]
-    
-    @staticmethod
-    def get_customizable_elements(template_config: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """
-        Extract all customizable elements from a template
-        
-        Returns:
-            List of customizable element information
-        """
-        customizable_elements = []
+                # Validate element customization
+                _validate_element_customization(element, element_customization, errors)
         
-        if "scenes" not in template_config:
-            return customizable_elements
+        # Validate global customizations
+        if "duration" in customizations:
+            duration = customizations["duration"]
+            if not isinstance(duration, (int, float)) or duration <= 0:
+                errors.append("Duration must be a positive number")
         
-        customizable_element_ids = template_config.get("customizable_elements", [])
+        if "aspect_ratio" in customizations:
+            aspect_ratio = customizations["aspect_ratio"]
+            if not isinstance(aspect_ratio, str) or aspect_ratio not in _VALID_ASPECT_RATIOS:
+                errors.append(_INVALID_ASPECT_RATIO_ERROR)
         
-        for scene in template_config["scenes"]:
-            if "elements" not in scene:
-                continue
-            
-            for element in scene["elements"]:
-                element_id = element.get("id")
-                if element_id in customizable_element_ids:
-                    customizable_elements.append({
-                        "id": element_id,
-                        "type": element.get("type"),
-                        "scene_id": scene.get("id"),
-                        "current_properties": element.get("properties", {}),
-                        "position": element.get("position", {}),
-                        "size": element.get("size", {}),
-                        "customization_options": TemplateCustomizer._get_element_customization_options(element)
-                    })
-        
-        return customizable_elements
+    except Exception as e:
+        errors.append(f"Validation error: {str(e)}")
     
-    @staticmethod
-    def _get_element_customization_options(element: Dict[str, Any]) -> Dict[str, Any]:
-        """Get available customization options for an element based on its type"""
-        element_type = element.get("type")
-        
-        base_options = {
-            "position": {
-                "x": {"type": "number", "min": 0, "max": 100, "description": "X position (%)"},
-                "y": {"type": "number", "min": 0, "max": 100, "description": "Y position (%)"}
-            },
-            "size": {
-                "width": {"type": "number", "min": 1, "max": 100, "description": "Width (%)"},
-                "height": {"type": "number", "min": 1, "max": 100, "description": "Height (%)"}
-            }
-        }
-        
-        if element_type == "text":
-            base_options["properties"] = {
-                "text": {"type": "string", "description": "Text content"},
-                "fontSize": {"type": "number", "min": 8, "max": 200, "description": "Font size"},
-                "fontFamily": {"type": "string", "description": "Font family"},
-                "color": {"type": "color", "description": "Text color"},
-                "textAlign": {"type": "select", "options": ["left", "center", "right"], "description": "Text alignment"},
-                "fontWeight": {"type": "select", "options": ["normal", "bold", "100", "200", "300", "400", "500", "600", "700", "800", "900"], "description": "Font weight"}
-            }
-        elif element_type == "image":
-            base_options["properties"] = {
-                "src": {"type": "string", "description": "Image source URL"},
-                "opacity": {"type": "number", "min": 0, "max": 1, "description": "Image opacity"},
-                "filter": {"type": "string", "description": "CSS filter effects"}
-            }
-        elif element_type == "shape":
-            base_options["properties"] = {
-                "shapeType": {"type": "select", "options": ["rectangle", "circle", "triangle"], "description": "Shape type"},
-                "fillColor": {"type": "color", "description": "Fill color"},
-                "strokeColor": {"type": "color", "description": "Stroke color"},
-                "strokeWidth": {"type": "number", "min": 0, "max": 20, "description": "Stroke width"}
-            }
-        
-        return base_options
+    return {
+        "is_valid": len(errors) == 0,
+        "errors": errors,
+        "warnings": warnings
+    }
+
+
+def _build_element_index(template_config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Map element IDs to elements, keeping the first element for each ID"""
+    element_index = {}
+    for scene in template_config.get("scenes") or ():
+        for element in scene.get("elements") or ():
+            element_index.setdefault(element.get("id"), element)
     
-    @staticmethod
-    def validate_customizations(
-        template_config: Dict[str, Any],
-        customizations: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Validate customizations against template configuration
-        
-        Returns:
-            Dictionary with validation results
-        """
-        errors = []
-        warnings = []
-        
-        try:
-            customizable_element_ids = template_config.get("customizable_elements", [])
-            
-            # Validate element customizations
-            if "elements" in customizations:
-                for element_id, element_customization in customizations["elements"].items():
-                    if element_id not in customizable_element_ids:
-                        warnings.append(f"Element '{element_id}' is not marked as customizable")
-                    
-                    # Find the element in the template
-                    element = TemplateCustomizer._find_element_by_id(template_config, element_id)
-                    if not element:
-                        errors.append(f"Element '{element_id}' not found in template")
-                        continue
-                    
-                    # Validate element customization
-                    element_errors = TemplateCustomizer._validate_element_customization(
-                        element, element_customization
-                    )
-                    errors.extend(element_errors)
-            
-            # Validate global customizations
-            if "duration" in customizations:
-                duration = customizations["duration"]
-                if not isinstance(duration, (int, float)) or duration <= 0:
-                    errors.append("Duration must be a positive number")
-            
-            if "aspect_ratio" in customizations:
-                valid_ratios = ["16:9", "9:16", "1:1", "21:9"]
-                if customizations["aspect_ratio"] not in valid_ratios:
-                    errors.append(f"Invalid aspect ratio. Must be one of: {valid_ratios}")
-            
-        except Exception as e:
-            errors.append(f"Validation error: {str(e)}")
-        
-        return {
-            "is_valid": len(errors) == 0,
-            "errors": errors,
-            "warnings": warnings
-        }
+    return element_index
+
+
+def _validate_element_customization(
+    element: Dict[str, Any],
+    customization: Dict[str, Any],
+    errors: List[str]
+) -> None:
+    """Validate customization for a specific element, appending any problems to errors"""
+    if "properties" in customization:
+        property_ranges = _PROPERTY_RANGES.get(element.get("type"))
+        if property_ranges:
+            _check_ranges(customization["properties"], property_ranges, errors)
     
-    @staticmethod
-    def _find_element_by_id(template_config: Dict[str, Any], element_id: str) -> Optional[Dict[str, Any]]:
-        """Find an element by ID in the template configuration"""
-        if "scenes" not in template_config:
-            return None
-        
-        for scene in template_config["scenes"]:
-            if "elements" not in scene:
-                continue
-            
-            for element in scene["elements"]:
-                if element.get("id") == element_id:
-                    return element
-        
-        return None
+    if "position" in customization:
+        _check_ranges(customization["position"], _POSITION_RANGES, errors)
     
-    @staticmethod
-    def _validate_element_customization(
-        element: Dict[str, Any],
-        customization: Dict[str, Any]
-    ) -> List[str]:
-        """Validate customization for a specific element"""
-        errors = []
-        element_type = element.get("type")
+    if "size" in customization:
+        _check_ranges(customization["size"], _SIZE_RANGES, errors)
+
+
+def generate_preview_config(
+    template_config: Dict[str, Any],
+    customizations: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Generate a preview configuration with customizations applied
+    
+    This creates a lightweight version suitable for preview generation
+    """
+    try:
+        # Apply customizations
+        preview_config = customize_template(template_config, customizations)
         
-        # Validate properties based on element type
-        if "properties" in customization:
-            properties = customization["properties"]
-            
-            if element_type == "text":
-                if "fontSize" in properties:
-                    font_size = properties["fontSize"]
-                    if not isinstance(font_size, (int, float)) or font_size < 8 or font_size > 200:
-                        errors.append("Font size must be between 8 and 200")
-            
-            elif element_type == "image":
-                if "opacity" in properties:
-                    opacity = properties["opacity"]
-                    if not isinstance(opacity, (int, float)) or opacity < 0 or opacity > 1:
-                        errors.append("Opacity must be between 0 and 1")
+        # Reduce duration for faster preview generation
+        if preview_config.get("duration", 0) > 10:
+            preview_config["duration"] = 10
+            _adjust_scene_durations(preview_config, 10)
         
-        # Validate position
-        if "position" in customization:
-            position = customization["position"]
-            for coord in ["x", "y"]:
-                if coord in position:
-                    value = position[coord]
-                    if not isinstance(value, (int, float)) or value < 0 or value > 100:
-                        errors.append(f"Position {coord} must be between 0 and 100")
+        # Simplify animations for preview. Elements may be shared with the
+        # template, so truncate copies and only rebuild scenes that change.
+        scenes = preview_config.get("scenes")
+        if scenes:
+            preview_scenes = []
+            for scene in scenes:
+                elements = scene.get("elements")
+                if elements:
+                    preview_elements = None
+                    for index, element in enumerate(elements):
+                        if "animations" in element and len(element["animations"]) > 1:
+                            if preview_elements is None:
+                                preview_elements = list(elements)
+                            # Keep only the first animation for preview
+                            preview_elements[index] = {**element, "animations": element["animations"][:1]}
+                    if preview_elements is not None:
+                        scene = {**scene, "elements": preview_elements}
+                preview_scenes.append(scene)
+            preview_config["scenes"] = preview_scenes
         
-        # Validate size
-        if "size" in customization:
-            size = customization["size"]
-            for dimension in ["width", "height"]:
-                if dimension in size:
-                    value = size[dimension]
-                    if not isinstance(value, (int, float)) or value < 1 or value > 100:
-                        errors.append(f"Size {dimension} must be between 1 and 100")
+        return preview_config
         
-        return errors
+    except Exception as e:
+        logger.error(f"Preview generation failed: {str(e)}")
+        raise ValueError(f"Failed to generate preview: {str(e)}")
+
+
+class TemplateCustomizer:
+    """Engine for customizing template parameters dynamically"""
     
-    @staticmethod
-    def generate_preview_config(
-        template_config: Dict[str, Any],
-        customizations: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Generate a preview configuration with customizations applied
-        
-        This creates a lightweight version suitable for preview generation
-        """
-        try:
-            # Apply customizations
-            preview_config = TemplateCustomizer.customize_template(template_config, customizations)
-            
-            # Reduce duration for faster preview generation
-            if preview_config.get("duration", 0) > 10:
-                preview_config["duration"] = 10
-                TemplateCustomizer._adjust_scene_durations(preview_config, 10)
-            
-            # Simplify animations for preview
-            if "scenes" in preview_config:
-                for scene in preview_config["scenes"]:
-                    if "elements" in scene:
-                        for element in scene["elements"]:
-                            if "animations" in element:
-                                # Keep only the first animation for preview
-                                element["animations"] = element["animations"][:1]
-            
-            return preview_config
-            
-        except Exception as e:
-            logger.error(f"Preview generation failed: {str(e)}")
-            raise ValueError(f"Failed to generate preview: {str(e)}")
+    customize_template = staticmethod(customize_template)
+    _adjust_scene_durations = staticmethod(_adjust_scene_durations)
+    _duration_scale_factor = staticmethod(_duration_scale_factor)
+    _apply_scene_customizations = staticmethod(_apply_scene_customizations)
+    _apply_element_customization = staticmethod(_apply_element_customization)
+    get_customizable_elements = staticmethod(get_customizable_elements)
+    _get_element_customization_options = staticmethod(_get_element_customization_options)
+    validate_customizations = staticmethod(validate_customizations)
+    _build_element_index = staticmethod(_build_element_index)
+    _validate_element_customization = staticmethod(_validate_element_customization)
+    generate_preview_config = staticmethod(generate_preview_config)
@@ -2,33 +2,51 @@
 WebSocket manager for real-time communication
 """
 
-import json
 import asyncio
+import orjson
 import logging
-from typing import Dict, List, Any, Optional, Set
-from datetime import datetime
+from typing import Deque, Dict, List, Any, Optional, Set
+from datetime import datetime, timedelta
 from fastapi import WebSocket, WebSocketDisconnect
-from collections import defaultdict
+from collections import defaultdict, deque
 import uuid
 
 logger = logging.getLogger(__name__)
 
 
+def _serialize(message: Dict[str, Any]) -> str:
+    """Encode a message as a JSON text frame payload"""
+    # Stats messages are keyed by integer user IDs, which orjson rejects by default
+    return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class ConnectionManager:
     """Manages WebSocket connections and real-time communication"""
     
+    # Offline queue bounds: messages kept per user (oldest dropped first) and their lifetime
+    MAX_OFFLINE_MESSAGES = 500
+    OFFLINE_MESSAGE_TTL = timedelta(days=1)
+    # Seconds between passes of the background offline message reaper
+    OFFLINE_REAP_INTERVAL = 60.0
+    
     def __init__(self):
         # Store active connections by user ID
-        self.active_connections: Dict[int, List[WebSocket]] = defaultdict(list)
+        self.active_connections: Dict[int, Set[WebSocket]] = defaultdict(set)
         
         # Store connection metadata
         self.connection_metadata: Dict[str, Dict[str, Any]] = {}
         
+        # Reverse index from WebSocket to connection ID
+        self.connection_ids: Dict[WebSocket, str] = {}
+        
         # Store room-based connections (for collaborative features)
         self.rooms: Dict[str, Set[str]] = defaultdict(set)
         
         # Message queue for offline users
-        self.offline_messages: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        self.offline_messages: Dict[int, Deque[Dict[str, Any]]] = defaultdict(
+            lambda: deque(maxlen=self.MAX_OFFLINE_MESSAGES)
+        )
+        self._queued_count = 0
         
         # Connection statistics
         self.stats = {
@@ -46,15 +64,17 @@ class ConnectionManager:
             connection_id = str(uuid.uuid4())
         
         # Add to active connections
-        self.active_connections[user_id].append(websocket)
+        self.active_connections[user_id].add(websocket)
         
         # Store connection metadata
+        connected_at = datetime.now().isoformat()
         self.connection_metadata[connection_id] = {
             "user_id": user_id,
             "websocket": websocket,
-            "connected_at": datetime.now().isoformat(),
-            "last_activity": datetime.now().isoformat()
+            "connected_at": connected_at,
+            "last_activity": connected_at
         }
+        self.connection_ids[websocket] = connection_id
         
         # Update statistics
         self.stats["total_connections"] += 1
@@ -78,21 +98,17 @@ class ConnectionManager:
     def disconnect(self, user_id: int, websocket: WebSocket):
         """Remove a WebSocket connection"""
         if user_id in self.active_connections:
-            if websocket in self.active_connections[user_id]:
-                self.active_connections[user_id].remove(websocket)
-                
-                # Remove empty user entries
-                if not self.active_connections[user_id]:
-                    del self.active_connections[user_id]
-        
-        # Remove from connection metadata
-        connection_id = None
-        for conn_id, metadata in self.connection_metadata.items():
-            if metadata["websocket"] == websocket:
-                connection_id = conn_id
-                break
+            connections = self.active_connections[user_id]
+            connections.discard(websocket)
+            
+            # Remove empty user entries
+            if not connections:
+                del self.active_connections[user_id]
         
-        if connection_id:
+        # Remove from connection metadata, unless the ID was reused by a newer connection
+        connection_id = self.connection_ids.pop(websocket, None)
+        metadata = self.connection_metadata.get(connection_id)
+        if metadata is not None and metadata["websocket"] is websocket:
             del self.connection_metadata[connection_id]
         
         # Update statistics
@@ -102,43 +118,62 @@ class ConnectionManager:
     
     async def send_personal_message(self, message: Dict[str, Any], user_id: int):
         """Send a message to a specific user"""
+        await self._send_to_user(message, user_id)
+    
+    async def _send_to_user(self, message: Dict[str, Any], user_id: int, payload: Optional[str] = None):
+        """Send a message to a user, reusing payload as its serialized form when given"""
         if user_id in self.active_connections:
-            # Send to all user's active connections
-            disconnected_connections = []
-            
-            for websocket in self.active_connections[user_id]:
-                try:
-                    await websocket.send_text(json.dumps(message))
-                    self.stats["messages_sent"] += 1
-                except Exception as e:
-                    logger.warning(f"Failed to send message to user {user_id}: {e}")
-                    disconnected_connections.append(websocket)
+            # Send to all user's active connections concurrently
+            if payload is None:
+                payload = _serialize(message)
+            websockets = list(self.active_connections[user_id])
+            results = await asyncio.gather(*(
+                self._send_to_websocket(websocket, payload, user_id) for websocket in websockets
+            ))
             
             # Clean up disconnected connections
-            for websocket in disconnected_connections:
-                self.disconnect(user_id, websocket)
+            for websocket, sent in zip(websockets, results):
+                if not sent:
+                    self.disconnect(user_id, websocket)
         else:
-            # User is offline, queue the message
-            self.offline_messages[user_id].append({
+            # User is offline, queue the message; a full queue drops its oldest entry
+            queue = self.offline_messages[user_id]
+            if len(queue) < queue.maxlen:
+                self._queued_count += 1
+            queue.append({
                 **message,
                 "queued_at": datetime.now().isoformat()
             })
             logger.info(f"Message queued for offline user {user_id}")
     
+    async def _send_to_websocket(self, websocket: WebSocket, payload: str, user_id: int) -> bool:
+        """Send a serialized message to one connection, returning False if it failed"""
+        try:
+            await websocket.send_text(payload)
+            self.stats["messages_sent"] += 1
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to send message to user {user_id}: {e}")
+            return False
+    
     async def send_room_message(self, message: Dict[str, Any], room_id: str):
         """Send a message to all users in a room"""
         if room_id in self.rooms:
+            payload = _serialize(message)
             for connection_id in self.rooms[room_id]:
                 if connection_id in self.connection_metadata:
                     metadata = self.connection_metadata[connection_id]
                     user_id = metadata["user_id"]
-                    await self.send_personal_message(message, user_id)
+                    await self._send_to_user(message, user_id, payload)
     
     async def broadcast_message(self, message: Dict[str, Any], exclude_user: Optional[int] = None):
         """Broadcast a message to all connected users"""
-        for user_id in list(self.active_connections.keys()):
-            if exclude_user is None or user_id != exclude_user:
-                await self.send_personal_message(message, user_id)
+        payload = _serialize(message)
+        await asyncio.gather(*(
+            self._send_to_user(message, user_id, payload)
+            for user_id in list(self.active_connections.keys())
+            if exclude_user is None or user_id != exclude_user
+        ))
     
     async def join_room(self, connection_id: str, room_id: str):
         """Add a connection to a room"""
@@ -182,31 +217,79 @@ class ConnectionManager:
     async def _send_offline_messages(self, user_id: int):
         """Send queued messages to a newly connected user"""
         if user_id in self.offline_messages:
-            messages = self.offline_messages[user_id]
+            # Take the queue first so messages queued while delivering are kept
+            messages = self.offline_messages.pop(user_id)
+            self._queued_count -= len(messages)
             
-            for message in messages:
-                await self.send_personal_message({
-                    **message,
-                    "type": "offline_message",
-                    "delivered_at": datetime.now().isoformat()
-                }, user_id)
+            # Deliver the whole queue as one frame
+            delivered_at = datetime.now().isoformat()
+            await self.send_personal_message({
+                "type": "offline_batch",
+                "messages": [
+                    {**message, "type": "offline_message", "delivered_at": delivered_at}
+                    for message in messages
+                ],
+                "count": len(messages),
+                "timestamp": delivered_at
+            }, user_id)
+            
+            if user_id not in self.active_connections:
+                # Every connection failed, so keep the messages for the next reconnect.
+                # They go back ahead of anything queued during the send to stay oldest
+                # first, and a full queue drops the oldest messages as usual.
+                newer = self.offline_messages.pop(user_id, ())
+                queue = self.offline_messages[user_id]
+                queue.extend(messages)
+                queue.extend(newer)
+                self._queued_count += len(queue) - len(newer)
+                return
             
-            # Clear the queue
-            del self.offline_messages[user_id]
             logger.info(f"Delivered {len(messages)} offline messages to user {user_id}")
     
-    def get_connection_stats(self) -> Dict[str, Any]:
-        """Get connection statistics"""
-        return {
+    def expire_offline_messages(self) -> int:
+        """Drop queued offline messages older than OFFLINE_MESSAGE_TTL, returning how many were dropped"""
+        # queued_at values are ISO timestamps from the same clock, so they order as strings
+        cutoff = (datetime.now() - self.OFFLINE_MESSAGE_TTL).isoformat()
+        expired = 0
+        
+        for user_id in list(self.offline_messages):
+            messages = self.offline_messages[user_id]
+            while messages and messages[0]["queued_at"] < cutoff:
+                messages.popleft()
+                expired += 1
+            if not messages:
+                del self.offline_messages[user_id]
+        
+        self._queued_count -= expired
+        return expired
+    
+    async def run_offline_reaper(self):
+        """Periodically expire old offline messages; runs until cancelled"""
+        while True:
+            await asyncio.sleep(self.OFFLINE_REAP_INTERVAL)
+            try:
+                expired = self.expire_offline_messages()
+                if expired:
+                    logger.debug(f"Expired {expired} offline WebSocket messages")
+            except Exception as e:
+                logger.error(f"Offline message reaper error: {e}")
+    
+    def get_connection_stats(self, include_per_user: bool = True) -> Dict[str, Any]:
+        """Get connection statistics; the per-user breakdown is the only part that scales with users"""
+        stats = {
             **self.stats,
             "active_users": len(self.active_connections),
             "active_rooms": len(self.rooms),
-            "queued_messages": sum(len(messages) for messages in self.offline_messages.values()),
-            "connections_by_user": {
+            "queued_messages": self._queued_count
+        }
+        
+        if include_per_user:
+            stats["connections_by_user"] = {
                 user_id: len(connections) 
                 for user_id, connections in self.active_connections.items()
             }
-        }
+        
+        return stats
     
     def get_room_info(self, room_id: str) -> Dict[str, Any]:
         """Get information about a specific room"""
@@ -10,6 +10,7 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import time
 import os
 from pathlib import Path
@@ -19,11 +20,23 @@ from app.core.logging import setup_logging
 from app.db.database import create_tables
 from app.api.api_v1.api import api_router
 from app.core.exceptions import setup_exception_handlers
+from app.utils.rate_limiter import rate_limiter
+from app.utils.websocket_manager import connection_manager
 
 # Setup logging
 logger = setup_logging()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background maintenance tasks"""
+    reaper_task = asyncio.create_task(rate_limiter.run_reaper())
+    offline_reaper_task = asyncio.create_task(connection_manager.run_offline_reaper())
+    yield
+    reaper_task.cancel()
+    offline_reaper_task.cancel()
+
+
 # Create FastAPI application
 app = FastAPI(
     title="GenXvids API",
@@ -31,7 +44,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # Add middleware
@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+from collections import deque
+from apps.backend.app.utils.quality_validator import (
+    BENCHMARK_CONFIGS, PerformanceTester, SystemHealthChecker, VideoQualityValidator
+)
+
+INVALID_SCENE = {
+    "id": "s1",
+    "duration": 0,
+    "elements": [
+        {
+            "id": "e1",
+            "type": "text",
+            "position": {"x": 10, "y": 10},
+            "size": {"width": 50, "height": 20},
+            "properties": {"text": ""}
+        }
+    ]
+}
+
+CONFIG_ERROR_PREFIX = "Configuration validation error:"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("config, expected_errors, expected_warnings, type_error", [
+    (
+        {"duration": 0.5, "aspect_ratio": "4:3", "quality": "best", "fps": None, "scenes": [INVALID_SCENE]},
+        [
+            "Duration too short: 0.5s (minimum: 1.0s)",
+            "Unsupported aspect ratio: 4:3",
+            "Invalid quality setting: best"
+        ],
+        [],
+        True
+    ),
+    (
+        {"duration": "10", "quality": "best", "scenes": [INVALID_SCENE]},
+        [],
+        [],
+        True
+    ),
+    (
+        {"duration": 10, "quality": None, "fps": "30", "scenes": [INVALID_SCENE]},
+        ["Invalid quality setting: None"],
+        [],
+        True
+    ),
+    (
+        {"duration": 700, "aspect_ratio": ["16:9"], "quality": "high", "fps": 90, "scenes": [INVALID_SCENE]},
+        [
+            "Duration too long: 700s (maximum: 600.0s)",
+            "Unsupported aspect ratio: ['16:9']",
+            "Scene s1: Invalid duration 0",
+            "Scene s1, Element e1: Text element missing text content"
+        ],
+        ["High FPS: 90 (recommended maximum: 60)"],
+        False
+    ),
+    (
+        {"duration": 10, "fps": 5, "scenes": []},
+        ["No scenes provided"],
+        ["Low FPS: 5 (recommended minimum: 15)"],
+        False
+    ),
+])
+async def test_validate_video_config_mixed_invalid(config, expected_errors, expected_warnings, type_error):
+    """Each invalid field is reported in order until a value cannot be compared"""
+    result = await VideoQualityValidator().validate_video_config(config)
+    assert result["is_valid"] is False
+    if type_error:
+        # The wording of the underlying TypeError is up to the interpreter
+        assert result["errors"][:-1] == expected_errors
+        assert result["errors"][-1].startswith(CONFIG_ERROR_PREFIX)
+    else:
+        assert result["errors"] == expected_errors
+        assert not any(error.startswith(CONFIG_ERROR_PREFIX) for error in result["errors"])
+    assert result["warnings"] == expected_warnings
+
+    fast_result = await VideoQualityValidator().validate_video_config(config, fast=True)
+    assert fast_result == {"is_valid": False}
+
+
+@pytest.mark.parametrize("test_type", list(BENCHMARK_CONFIGS))
+def test_benchmark_test_config_is_shared_read_only(test_type):
+    config = BENCHMARK_CONFIGS[test_type]
+    test_config = PerformanceTester()._generate_test_config(config)
+
+    assert test_config is PerformanceTester()._generate_test_config(config)
+    assert set(test_config) == {"duration", "aspect_ratio", "quality", "fps", "scenes"}
+    assert len(test_config["scenes"]) == config.scenes
+    with pytest.raises(TypeError):
+        test_config["_complexity"] = 0
+    with pytest.raises(TypeError):
+        test_config["scenes"][0]["elements"][0]["properties"]["text"] = "changed"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("test_type", list(BENCHMARK_CONFIGS))
+async def test_benchmark_complexity_matches_scene_traversal(test_type, monkeypatch):
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    config = BENCHMARK_CONFIGS[test_type]
+    tester = PerformanceTester()
+    test_config = tester._generate_test_config(config)
+
+    traversed = await tester._simulate_video_processing(test_config)
+    passed = await tester._simulate_video_processing(
+        test_config, complexity_factor=config.scenes * config.scenes * config.elements_per_scene
+    )
+    assert passed == traversed
+
+
+def test_performance_summary_counts_results_beyond_history():
+    tester = PerformanceTester()
+    tester.test_results = deque(maxlen=0)  # PERFORMANCE_HISTORY_SIZE=0
+    tester._record_result({"success": True, "performance_score": 80.0, "processing_time": 0.5})
+    tester._record_result({"success": False, "error": "boom"})
+
+    summary = tester.get_performance_summary()
+    assert summary["total_tests"] == 2
+    assert summary["successful_tests"] == 1
+    assert summary["failed_tests"] == 1
+    assert summary["average_performance_score"] == 80.0
+    assert summary["test_history"] == []
+
+
+@pytest.mark.asyncio
+async def test_health_check_reports_cancelled_check_as_failed():
+    async def cancelled_check():
+        raise asyncio.CancelledError()
+
+    checker = SystemHealthChecker()
+    checker.health_checks["database"] = cancelled_check
+
+    health_status = await checker.run_health_check()
+    assert health_status["overall_status"] == "unhealthy"
+    assert health_status["checks"]["database"]["healthy"] is False
+    assert health_status["checks"]["database"]["status"] == "check_failed"
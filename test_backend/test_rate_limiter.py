@@ -0,0 +1,175 @@
+import math
+import random
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+from apps.backend.app.utils.rate_limiter import APIOptimizer, RateLimiter, RateLimitCategory, ResponseTimeWindow
+
+AUTH_CAPACITY = 10
+AUTH_WINDOW = 300
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def make_request(path="/api/v1/auth/login", method="POST", client_ip="10.0.0.1"):
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [],
+        "client": (client_ip, 12345),
+        "server": ("testserver", 80),
+        "scheme": "http",
+    })
+
+
+@pytest.mark.asyncio
+async def test_burst_then_429_after_exhaustion():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+
+    for _ in range(AUTH_CAPACITY):
+        assert await limiter.check_rate_limit(make_request()) is None
+
+    response = await limiter.check_rate_limit(make_request())
+    assert response is not None
+    assert response.status_code == HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == str(math.ceil(AUTH_WINDOW / AUTH_CAPACITY))
+
+    # Other clients and categories have their own buckets
+    assert await limiter.check_rate_limit(make_request(client_ip="10.0.0.2")) is None
+    assert await limiter.check_rate_limit(make_request(path="/api/v1/templates", method="GET")) is None
+
+
+@pytest.mark.asyncio
+async def test_refill_restores_tokens_over_time():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+
+    for _ in range(AUTH_CAPACITY):
+        assert await limiter.check_rate_limit(make_request()) is None
+    assert await limiter.check_rate_limit(make_request()) is not None
+
+    # One token refills every window / capacity seconds
+    clock.advance(AUTH_WINDOW / AUTH_CAPACITY + 0.001)
+    assert await limiter.check_rate_limit(make_request()) is None
+    assert await limiter.check_rate_limit(make_request()) is not None
+
+    # A full window refills the bucket to capacity, but not beyond it
+    clock.advance(AUTH_WINDOW * 2)
+    assert limiter.get_rate_limit_info(make_request())["remaining"] == AUTH_CAPACITY
+    for _ in range(AUTH_CAPACITY):
+        assert await limiter.check_rate_limit(make_request()) is None
+    assert await limiter.check_rate_limit(make_request()) is not None
+
+
+@pytest.mark.parametrize("method, path, category", [
+    ("POST", "/api/v1/auth/login", RateLimitCategory.AUTH),
+    ("POST", "/x\n/api/v1/auth/login", RateLimitCategory.AUTH),
+    ("GET", "/api/v1/videos/upload", RateLimitCategory.UPLOAD),
+    ("POST", "/x\n/api/v1/assets/", RateLimitCategory.UPLOAD),
+    ("GET", "/api/v1/assets/", RateLimitCategory.DEFAULT),
+    ("POST", "/api/v1/videos/generate", RateLimitCategory.VIDEO_GENERATION),
+    ("POST", "/x\n/api/v1/videos/generate", RateLimitCategory.VIDEO_GENERATION),
+    ("GET", "/api/v1/videos/1", RateLimitCategory.API_HEAVY),
+    ("GET", "/x\n/api/v1/templates/preview", RateLimitCategory.API_HEAVY),
+    ("GET", "/api/v1/templates", RateLimitCategory.DEFAULT),
+])
+def test_rate_limit_category(method, path, category):
+    assert RateLimiter()._get_rate_limit_key(make_request(path=path, method=method)) == category
+
+
+class TinyRateLimiter(RateLimiter):
+    __slots__ = ()
+    MAX_BUCKETS = 2
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_at_max_buckets():
+    limiter = TinyRateLimiter(clock=FakeClock())
+
+    await limiter.check_rate_limit(make_request(client_ip="a"))
+    await limiter.check_rate_limit(make_request(client_ip="b"))
+    # Touching "a" makes "b" the least recently used bucket
+    await limiter.check_rate_limit(make_request(client_ip="a"))
+    await limiter.check_rate_limit(make_request(client_ip="c"))
+
+    assert list(limiter._buckets) == [("ip_a", RateLimitCategory.AUTH), ("ip_c", RateLimitCategory.AUTH)]
+    assert limiter._buckets[("ip_a", RateLimitCategory.AUTH)][0] == AUTH_CAPACITY - 2
+
+
+@pytest.mark.asyncio
+async def test_reaper_drops_idle_buckets_in_batches():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+
+    for client in range(4):
+        await limiter.check_rate_limit(make_request(client_ip=str(client)))
+        clock.advance(1)
+    # Client 0 becomes the most recently used bucket
+    await limiter.check_rate_limit(make_request(client_ip="0"))
+
+    # Buckets are only reaped once idle for a full window
+    clock.advance(AUTH_WINDOW - 4)
+    assert limiter.reap_idle_buckets(100) == 0
+    assert len(limiter._buckets) == 4
+
+    # Each batch resumes with the least recently used buckets that remain
+    clock.advance(3)
+    assert limiter.reap_idle_buckets(1) == 1
+    assert [key[0] for key in limiter._buckets] == ["ip_2", "ip_3", "ip_0"]
+    assert limiter.reap_idle_buckets(5) == 2
+    assert [key[0] for key in limiter._buckets] == ["ip_0"]
+
+    clock.advance(1)
+    assert limiter.reap_idle_buckets(1) == 1
+    assert not limiter._buckets
+
+
+def test_response_time_window_matches_naive_list():
+    window = ResponseTimeWindow(5)
+    assert (len(window), window.average, window.minimum, window.maximum) == (0, 0, 0, 0)
+
+    rng = random.Random(1234)
+    # Runs of rising, falling and repeated values exercise both candidate deques
+    values = [rng.uniform(0, 2) for _ in range(40)] + list(range(10)) + list(range(10, 0, -1)) + [0.5] * 7
+    naive = []
+    for value in values:
+        window.add(value)
+        naive = (naive + [value])[-5:]
+
+        assert len(window) == len(naive)
+        assert window.average == pytest.approx(sum(naive) / len(naive))
+        assert window.minimum == min(naive)
+        assert window.maximum == max(naive)
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"skip": 0, "limit": 20}, {"skip": 0, "limit": 20}),
+    ({"skip": "5", "public": "true", "q": "cats", "tag": None}, {"skip": 5, "public": True, "q": "cats"}),
+])
+def test_optimize_query_params_returns_new_dict(params, expected):
+    optimized = APIOptimizer().optimize_query_params(params)
+    assert optimized == expected
+    assert optimized is not params
+
+
+def test_processing_time_header_in_seconds():
+    response = Response()
+    APIOptimizer().add_performance_headers(response, 0.0004)
+    assert response.headers["X-Processing-Time"] == "0.000s"
+    APIOptimizer().add_performance_headers(response, 0.1234)
+    assert response.headers["X-Processing-Time"] == "0.123s"
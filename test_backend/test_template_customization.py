@@ -1,6 +1,8 @@
+import copy
 import pytest
 from unittest.mock import patch, Mock, AsyncMock
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED
+from apps.backend.app.utils.template_customizer import TemplateCustomizer
 
 @patch('apps.backend.app.db.database.get_db')
 @patch('apps.backend.app.services.template_service.TemplateService.get_template_by_id')
@@ -79,3 +81,70 @@ def test_customize_template(mock_customize_template, mock_validate_customization
     }
     response = test_app.post("/api/v1/templates/1/customize", headers=headers, json=payload)
     assert response.status_code == HTTP_200_OK
+
+
+def test_customization_leaves_source_template_unmodified():
+    template_config = {
+        "duration": 20.0,
+        "aspect_ratio": "16:9",
+        "scenes": [
+            {
+                "id": "scene1",
+                "type": "intro",
+                "duration": 5.0,
+                "elements": [
+                    {
+                        "id": "text1",
+                        "type": "text",
+                        "position": {"x": 50, "y": 50},
+                        "size": {"width": 80, "height": 20},
+                        "properties": {"text": "Hello World", "color": "#FFFFFF"},
+                        "animations": [{"type": "fade_in"}, {"type": "slide_up"}]
+                    }
+                ]
+            },
+            {
+                "id": "scene2",
+                "type": "main",
+                "duration": 15.0,
+                "elements": [
+                    {
+                        "id": "image1",
+                        "type": "image",
+                        "position": {"x": 0, "y": 0},
+                        "size": {"width": 100, "height": 100},
+                        "properties": {"src": "background.png"},
+                        "animations": [{"type": "zoom"}, {"type": "fade_out"}]
+                    }
+                ]
+            }
+        ],
+        "default_style": "cinematic"
+    }
+    original = copy.deepcopy(template_config)
+    customizations = {
+        "duration": 30.0,
+        "aspect_ratio": "9:16",
+        "default_style": "minimal",
+        "elements": {
+            "text1": {
+                "properties": {"text": "Custom Title"},
+                "position": {"x": 10, "y": 10},
+                "animations": [{"type": "bounce"}, {"type": "fade_out"}]
+            }
+        },
+        "scenes": {
+            "scene2": {"type": "outro", "transitions": [{"type": "wipe"}]}
+        }
+    }
+    
+    customized = TemplateCustomizer.customize_template(template_config, customizations)
+    preview = TemplateCustomizer.generate_preview_config(template_config, customizations)
+    
+    assert template_config == original
+    assert customized["duration"] == 30.0
+    assert [scene["duration"] for scene in customized["scenes"]] == [7.5, 22.5]
+    assert customized["scenes"][0]["elements"][0]["properties"] == {"text": "Custom Title", "color": "#FFFFFF"}
+    assert customized["scenes"][1]["type"] == "outro"
+    assert preview["duration"] == 10
+    assert [len(scene["elements"][0]["animations"]) for scene in preview["scenes"]] == [1, 1]
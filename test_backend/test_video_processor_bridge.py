@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import AsyncMock
+from apps.backend.app.utils.video_processor_bridge import VideoProcessorBridge
+
+SIMPLE_RESULT = {"success": True, "output_path": "out.mp4"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", [
+    AsyncMock(side_effect=Exception("Video engine failed: node crashed")),
+    AsyncMock(return_value={"success": False, "error": "render error"}),
+])
+async def test_engine_failure_falls_back_to_simple_generator(engine, tmp_path):
+    bridge = VideoProcessorBridge()
+    bridge.video_engine_enabled = True
+    bridge._process_with_typescript_engine = engine
+    bridge.simple_generator.generate_video = AsyncMock(return_value=SIMPLE_RESULT)
+    output_path = str(tmp_path / "out.mp4")
+
+    result = await bridge.process_video([], {}, output_path)
+
+    assert result == SIMPLE_RESULT
+    engine.assert_awaited_once()
+    bridge.simple_generator.generate_video.assert_awaited_once_with([], {}, output_path)
+
+
+@pytest.mark.asyncio
+async def test_engine_success_skips_simple_generator(tmp_path):
+    bridge = VideoProcessorBridge()
+    bridge.video_engine_enabled = True
+    bridge._process_with_typescript_engine = AsyncMock(return_value={"success": True, "output_path": "engine.mp4"})
+    bridge.simple_generator.generate_video = AsyncMock(return_value=SIMPLE_RESULT)
+
+    result = await bridge.process_video([], {}, str(tmp_path / "out.mp4"))
+
+    assert result["output_path"] == "engine.mp4"
+    bridge.simple_generator.generate_video.assert_not_awaited()
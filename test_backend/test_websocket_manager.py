@@ -0,0 +1,106 @@
+import orjson
+import pytest
+from datetime import datetime, timedelta
+from apps.backend.app.utils.websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """Records sent frames, or fails every send when broken"""
+
+    def __init__(self, broken=False, on_send=None):
+        self.broken = broken
+        self.on_send = on_send
+        self.accepted = False
+        self.sent = []
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, payload):
+        if self.on_send is not None:
+            await self.on_send(self)
+        if self.broken:
+            raise RuntimeError("connection closed")
+        self.sent.append(orjson.loads(payload))
+
+
+async def queue_offline_messages(manager, user_id, count):
+    for index in range(count):
+        await manager.send_personal_message({"type": "notification", "index": index}, user_id)
+
+
+@pytest.mark.asyncio
+async def test_offline_messages_delivered_as_one_batch():
+    manager = ConnectionManager()
+    await queue_offline_messages(manager, 1, 3)
+    assert manager._queued_count == 3
+
+    websocket = FakeWebSocket()
+    connection_id = await manager.connect(websocket, 1)
+
+    assert websocket.accepted
+    assert [frame["type"] for frame in websocket.sent] == ["offline_batch", "connection_established"]
+    batch = websocket.sent[0]
+    assert batch["count"] == 3
+    assert [message["index"] for message in batch["messages"]] == [0, 1, 2]
+    for message in batch["messages"]:
+        assert message["type"] == "offline_message"
+        assert message["delivered_at"] == batch["timestamp"]
+        assert "queued_at" in message
+    assert websocket.sent[1]["connection_id"] == connection_id
+
+    assert 1 not in manager.offline_messages
+    assert manager._queued_count == 0
+
+
+@pytest.mark.asyncio
+async def test_offline_messages_requeued_when_all_connections_fail():
+    manager = ConnectionManager()
+    await queue_offline_messages(manager, 1, 3)
+
+    websocket = FakeWebSocket(broken=True)
+    await manager.connect(websocket, 1)
+
+    # The failed send disconnects the user, so the confirmation is queued after the originals
+    assert 1 not in manager.active_connections
+    queued = list(manager.offline_messages[1])
+    assert [message["type"] for message in queued] == ["notification"] * 3 + ["connection_established"]
+    assert [message["index"] for message in queued[:3]] == [0, 1, 2]
+    assert manager._queued_count == 4
+
+    # The next connection receives everything in one batch
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, 1)
+    batch = websocket.sent[0]
+    assert batch["type"] == "offline_batch"
+    assert batch["count"] == 4
+    assert manager._queued_count == 0
+
+
+@pytest.mark.asyncio
+async def test_requeue_keeps_messages_queued_during_send_in_order():
+    manager = ConnectionManager()
+    manager.MAX_OFFLINE_MESSAGES = 4
+    await queue_offline_messages(manager, 1, 3)
+
+    async def drop_and_receive(websocket):
+        # The connection goes away mid-send and new messages are queued meanwhile
+        websocket.on_send = None
+        manager.disconnect(1, websocket)
+        for index in range(2):
+            await manager.send_personal_message({"type": "late", "index": index}, 1)
+
+    websocket = FakeWebSocket(broken=True, on_send=drop_and_receive)
+    await manager.connect(websocket, 1)
+
+    # Oldest first; overflow dropped the oldest originals, not the late messages
+    queued = list(manager.offline_messages[1])
+    assert [(message["type"], message.get("index")) for message in queued] == [
+        ("notification", 2), ("late", 0), ("late", 1), ("connection_established", None)
+    ]
+    assert manager._queued_count == 4
+
+    expired_at = datetime.now() - ConnectionManager.OFFLINE_MESSAGE_TTL
+    manager.offline_messages[1][0]["queued_at"] = (expired_at - timedelta(seconds=1)).isoformat()
+    assert manager.expire_offline_messages() == 1
+    assert manager._queued_count == 3